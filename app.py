@@ -25,13 +25,15 @@ PUT /update_id/{old_id} → Update alumni’s ID (e.g., change year)."""
 
 
 # Importing Necessary Libraries
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Path, Body
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Path, Body, Request, Response, Depends
 from fastapi.responses import JSONResponse
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, ClassVar, Dict, Annotated
+from typing import Optional, ClassVar, Dict, Annotated, Tuple, Literal, List, Callable, Iterable, Iterator
 import json
 import re
+import base64
+import hashlib
 import os
 import uuid
 from random import randint
@@ -39,11 +41,37 @@ from fastapi.openapi.utils import get_openapi
 import shutil
 from PIL import Image
 import io
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from email.utils import formatdate
 
+from archive import PhotoArchive, read_blocks, stream_zip
+from backends import JsonBackend, SqliteBackend
+from codec import codec
+from cache import ResponseCache
+from query import NUMERIC_FIELDS, Filters, SortSpec
+from store import AlumniStore
+
+
+
+# Load the alumni file once at startup; all reads are served from memory
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store.load()
+    responses.clear()
+    Alumni._batch_counts = store.batch_counts
+    yield
+    await store.close()
+
+
+# Responses are encoded by codec.py (orjson unless ALUMNI_JSON=json)
+class CodecJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return codec.dumps(content)
 
 
 #FastAPI App Initialization
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=CodecJSONResponse)
 
 #Alumni Model with Required Restrictions
 class Alumni(BaseModel):
@@ -123,51 +151,269 @@ class Alumni(BaseModel):
 #JSON File and Utility Functions
 # JSON file to store alumni data and batch counts
 DATA_FILE = "alumni_data.json"
+# Append-only log of changes made since the last snapshot of DATA_FILE
+JOURNAL_FILE = "alumni_journal.jsonl"
+# SQLite database used when ALUMNI_BACKEND=sqlite (imported from DATA_FILE on first start)
+DB_FILE = "alumni.db"
+STORAGE_BACKEND = os.environ.get("ALUMNI_BACKEND", "json")
 PHOTO_DIR = "photo/"
 os.makedirs(PHOTO_DIR, exist_ok=True)
+# Ready-made ZIP of every photo, refreshed when photos change (see archive.py)
+PHOTO_ARCHIVE_FILE = "all_photos.zip"
+photo_archive = PhotoArchive(PHOTO_DIR, PHOTO_ARCHIVE_FILE)
 
+# Process-wide alumni store (batch counts are shared with Alumni._batch_counts)
+if STORAGE_BACKEND == "sqlite":
+    store = AlumniStore(SqliteBackend(DB_FILE, migrate_from=JsonBackend(DATA_FILE, JOURNAL_FILE)))
+else:
+    store = AlumniStore(JsonBackend(DATA_FILE, JOURNAL_FILE))
+
+# Encoded bodies of the polled read endpoints, dropped as soon as a mutation touches them
+responses = ResponseCache(max_bytes=int(os.environ.get("ALUMNI_RESPONSE_CACHE_MB", "64")) * 2**20)
+store.listeners.append(responses.invalidate)
 
-# Utility functions to load/save data
-def load_data() -> dict:
-    if not os.path.exists(DATA_FILE):
-        return {"alumni": {}, "batch_counts": {}}
-    try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            # Load batch counts to ensure consistent IDs
-            Alumni._batch_counts = {k: int(v) for k, v in data.get("batch_counts", {}).items()}
-            return data
-    except json.JSONDecodeError:
-        return {"alumni": {}, "batch_counts": {}}
 
-def save_data(data: dict) -> None:
-    # Save batch counts alongside alumni data
-    data["batch_counts"] = Alumni._batch_counts
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+# Opaque keyset cursors: the sort key of the last record served, tied to the
+# ordering it was issued for so it can't be replayed against a different sort
+def encode_cursor(ordering: str, key: tuple) -> str:
+    raw = json.dumps({"o": ordering, "k": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort: SortSpec, cursor: Optional[str]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        key = data["k"]
+        # One value per sort field plus the ID, each of the type it is compared with
+        fields = [f for f, _ in sort.keys] + ["id"]
+        if data["o"] == sort.ordering and isinstance(key, list) and len(key) == len(fields) and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) if f in NUMERIC_FIELDS else isinstance(v, str)
+            for f, v in zip(fields, key)
+        ):
+            return tuple(key)
+    except (ValueError, KeyError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor for this query")
+
+
+# Field projection: ?fields=id,firstname,surname,batch trims records before they are
+# serialized (the store only materializes the requested columns). Plans are parsed
+# and validated once per distinct field list.
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return (e.g., id,firstname,surname,batch,profile_photo)"
+)
+
+
+@lru_cache(maxsize=256)
+def projection_plan(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+    plan = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in plan if f not in Alumni.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return plan
+
+
+def paged_response(
+    ordering: str,
+    total: int,
+    results: list,
+    keys: list,
+    limit: Optional[int],
+) -> dict:
+    # One extra record is fetched to tell whether another page exists
+    response = {"total": total, "results": results[:limit]}
+    if limit is not None:
+        has_more = len(results) > limit
+        response["next_cursor"] = encode_cursor(ordering, keys[limit - 1]) if has_more else None
+    return response
+
+
+# Conditional GET + response cache: polled endpoints carry a strong ETag (the store's
+# sequence number for the directory or record, plus a digest of the query parameters
+# shaping the body) and Last-Modified. A client sending a current ETag back in
+# If-None-Match gets an empty 304 before anything is queried or serialized; anyone
+# else gets the encoded bytes from the response cache (see cache.py) when possible.
+# Gzipped bodies are a different representation, so their ETag ends in "-gzip".
+def make_etag(seq: int, *variant) -> str:
+    digest = hashlib.blake2s(repr(variant).encode(), digest_size=8).hexdigest()
+    return f'"{seq}-{digest}"'
+
+
+def gzip_etag(etag: str) -> str:
+    return etag[:-1] + '-gzip"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The tag in If-None-Match naming `etag` (as the plain or the gzipped body), if any."""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in (etag, gzip_etag(etag)):
+            return tag
+    return None
+
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def validators(request: Request, key: tuple, version: Tuple[int, float]) -> Tuple[dict, Optional[Response]]:
+    """ETag / Last-Modified headers for a response, plus the 304 to send instead if the client is current."""
+    seq, modified = version
+    headers = {"ETag": make_etag(seq, *key), "Last-Modified": formatdate(modified, usegmt=True), "Vary": "Accept-Encoding"}
+    matched = etag_matches(request.headers.get("if-none-match"), headers["ETag"])
+    if matched:
+        # Confirm the representation the client holds
+        return headers, Response(status_code=304, headers={**headers, "ETag": matched})
+    return headers, None
+
+
+def cached_response(request: Request, entry, headers: dict, media_type: str = "application/json") -> Response:
+    body = responses.gzipped(entry) if accepts_gzip(request) else None
+    if body is not None:
+        headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = gzip_etag(headers["ETag"])
+    return Response(body or entry.body, media_type=media_type, headers=headers)
+
+
+def cached_json(
+    request: Request,
+    key: tuple,
+    version: Tuple[int, float],
+    build: Callable[[], object],
+    alumni_id: Optional[str] = None,
+) -> Response:
+    """Respond with build() as JSON, going through the ETag check and the response cache.
+
+    `key` is the endpoint plus every normalized parameter shaping the body;
+    `version` is store.version() of the whole directory, or of `alumni_id`
+    for a response about just that alumni.
+    """
+    headers, not_modified = validators(request, key, version)
+    if not_modified:
+        return not_modified
+    entry = responses.get(key, version[0])
+    if entry is None:
+        entry = responses.put(key, version[0], codec.dumps(build()), alumni_id)
+    return cached_response(request, entry, headers)
+
+
+# Full-directory dumps are streamed a chunk of records at a time, so memory stays
+# bounded however large the directory gets, and the first bytes go out right away
+STREAM_CHUNK = 1000
+NDJSON = "application/x-ndjson"
+FORMAT_QUERY = Query(
+    "json",
+    alias="format",
+    description="json: one document, streamed; ndjson: one alumni record per line",
+)
+
+
+def directory_chunks(fmt: str, plan: Optional[Tuple[str, ...]], extra: Callable[[], dict]) -> Iterator[bytes]:
+    """The directory as {"alumni": {id: record, ...}, **extra()} (or NDJSON records), in chunks.
+
+    extra() is read before the first record, so the records are at least as
+    new as what it reports (e.g. a seq from which replaying the journal is safe).
+    """
+    if fmt == "ndjson":
+        for records in store.iter_records(plan, STREAM_CHUNK):
+            yield b"".join(codec.dumps(r) + b"\n" for _, r in records)
+        return
+
+    tail = codec.dumps(extra())
+    yield b'{"alumni":{'
+    first = True
+    for records in store.iter_records(plan, STREAM_CHUNK):
+        if records:
+            # Encode the chunk as an object and splice its members in
+            members = codec.dumps(dict(records))[1:-1]
+            yield members if first else b"," + members
+            first = False
+    yield b"}" + (b"," + tail[1:] if len(tail) > 2 else b"}")
+
+
+def streamed_json(request: Request, key: tuple, media_type: str, chunks: Iterable[bytes]) -> Response:
+    """Stream `chunks` behind the ETag check; a complete body small enough is kept in the response cache."""
+    version = store.version()
+    headers, not_modified = validators(request, key, version)
+    if not_modified:
+        return not_modified
+    entry = responses.get(key, version[0])
+    if entry is not None:
+        return cached_response(request, entry, headers, media_type)
+
+    def body():
+        kept, size = [], 0
+        for chunk in chunks:
+            yield chunk
+            if kept is not None:
+                kept.append(chunk)
+                size += len(chunk)
+                if size > responses.max_bytes:
+                    kept = None
+        # Only cache it if nothing changed while streaming
+        if kept is not None and store.version()[0] == version[0]:
+            responses.put(key, version[0], b"".join(kept))
+
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
 
 
 @app.get("/view")
-def view():
-    data = load_data()
-    return data
+def view(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    fmt: Literal["json", "ndjson"] = FORMAT_QUERY,
+):
+    plan = projection_plan(fields)
+    chunks = directory_chunks(fmt, plan, lambda: {"batch_counts": store.counters()[1]})
+    return streamed_json(request, ("/view", plan, fmt), NDJSON if fmt == "ndjson" else "application/json", chunks)
+
+
+# Paginated /view: alumni in ID order, one page at a time
+@app.get("/view/page")
+def view_page(
+    request: Request,
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    offset: int = Query(0, ge=0, description="Records to skip (after the cursor, if any)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    plan = projection_plan(fields)
+    sort = SortSpec.parse(None)
+    after = decode_cursor(sort, cursor)
+
+    def build():
+        total, results, keys = store.query(Filters(), sort, offset=offset, limit=limit + 1, after=after, fields=plan)
+        return paged_response(sort.ordering, total, results, keys, limit)
+
+    return cached_json(request, ("/view/page", limit, offset, cursor, plan), store.version(), build)
 
 
 # 1️⃣ Create Alumni (JSON only)
 @app.post("/create_alumni")
 async def create_alumni(alumni: Alumni):
     try:
-        data = load_data()
-
         # ✅ Exclude id and batch so classmethod can handle them
         alumni_obj = Alumni.create(batch=alumni.batch, **alumni.model_dump(exclude={"id", "batch"}))
 
-        if alumni_obj.id in data.get("alumni", {}):
+        if alumni_obj.id in store:
             raise HTTPException(status_code=400, detail="Alumni ID already exists")
 
         # Save to JSON
-        data.setdefault("alumni", {})[alumni_obj.id] = alumni_obj.model_dump()
-        save_data(data)
+        await store.put(alumni_obj.model_dump())
 
         return {"message": "Alumni created successfully", "id": alumni_obj.id}
     except Exception as e:
@@ -181,9 +427,9 @@ async def create_alumni(alumni: Alumni):
 # 2️⃣ Upload photo for an existing alumni (with overwrite protection)
 @app.post("/upload_photo/{alumni_id}")
 async def upload_photo(alumni_id: str, profile_photo: UploadFile = File(...)):
-    data = load_data()
+    alumni = store.get(alumni_id)
 
-    if alumni_id not in data.get("alumni", {}):
+    if not alumni:
         raise HTTPException(status_code=404, detail="Alumni not found")
 
     # Always save as JPG
@@ -194,73 +440,207 @@ async def upload_photo(alumni_id: str, profile_photo: UploadFile = File(...)):
         contents = await profile_photo.read()
         with open(photo_path, "wb") as buffer:
             buffer.write(contents)
+        photo_archive.invalidate()
 
         # Update JSON record
-        data["alumni"][alumni_id]["profile_photo"] = photo_filename
-        save_data(data)
+        await store.put({**alumni, "profile_photo": photo_filename})
 
         return {"message": "Photo uploaded successfully", "filename": photo_filename}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving photo: {str(e)}")
 
 
+# Filters shared by /sort_alumni and /download/photos
+def alumni_filters(
+    batch: Optional[str] = Query(None, description="Filter by specific batch (e.g., 2008-10)"),
+    gender: Optional[str] = Query(None, description="Filter by gender (Male, Female, Other)"),
+    min_experience: Optional[float] = Query(None, description="Minimum Industry_experiences (inclusive)"),
+    max_experience: Optional[float] = Query(None, description="Maximum Industry_experiences (inclusive)"),
+    batch_from: Optional[int] = Query(None, description="Earliest batch start year (e.g., 2008)"),
+    batch_to: Optional[int] = Query(None, description="Latest batch start year (e.g., 2012)"),
+    skill: List[str] = Query([], description="Only alumni having all these skills (e.g., Python, Power BI)"),
+) -> Filters:
+    return Filters(
+        batch=batch,
+        gender=gender,
+        min_experience=min_experience,
+        max_experience=max_experience,
+        batch_from=batch_from,
+        batch_to=batch_to,
+        skills=skill,
+    )
+
+
 # for sorting
 @app.get("/sort_alumni")
 def sort_alumni(
-    sort_by: Optional[str] = Query(None, description="Sort by 'Industry_experiences' only"),
-    order: str = Query("asc", description="Sort in asc or desc order"),
-    batch: Optional[str] = Query(None, description="Filter by specific batch (e.g., 2008-10)"),
-    gender: Optional[str] = Query(None, description="Filter by gender (Male, Female, Other)")
+    request: Request,
+    sort_by: Optional[str] = Query(
+        None,
+        description="Comma-separated sort fields, each optionally suffixed with :asc or :desc "
+                    "(e.g., batch:desc,Industry_experiences:desc,surname:asc)"
+    ),
+    order: str = Query("asc", description="Sort in asc or desc order (for fields without a suffix)"),
+    # 🔹 Filters are resolved through the most selective index (see query.py)
+    filters: Filters = Depends(alumni_filters),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all results if omitted)"),
+    offset: int = Query(0, ge=0, description="Records to skip (after the cursor, if any)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY
 ):
-    data = load_data().get("alumni", {})
-
-    # Convert dict to list
-    alumni_list = list(data.values())
+    plan = projection_plan(fields)
 
-    # 🔹 Filter by batch if provided
-    if batch:
-        alumni_list = [a for a in alumni_list if a.get("batch") == batch]
+    # 🔹 Sorting (multi-key; unsorted results come in ID order)
+    try:
+        sort = SortSpec.parse(sort_by, order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    after = decode_cursor(sort, cursor)
+
+    def build():
+        total, results, keys = store.query(
+            filters,
+            sort,
+            offset=offset,
+            limit=None if limit is None else limit + 1,
+            after=after,
+            fields=plan,
+        )
+        return paged_response(sort.ordering, total, results, keys, limit)
 
-    # 🔹 Filter by gender if provided
-    if gender:
-        alumni_list = [a for a in alumni_list if a.get("gender") == gender]
+    # 🔹 Common queries are answered from the response cache
+    key = ("/sort_alumni", sort.ordering, *filters.key, limit, offset, cursor, plan)
+    return cached_json(request, key, store.version(), build)
 
-    # 🔹 Sorting (only Industry_experiences supported)
-    if sort_by:
-        if sort_by != "Industry_experiences":
-            raise HTTPException(
-                status_code=400,
-                detail="You can only sort by 'Industry_experiences'"
-            )
-        if order not in ["asc", "desc"]:
-            raise HTTPException(status_code=400, detail="Order must be 'asc' or 'desc'")
-
-        reverse_sort = True if order == "desc" else False
-        alumni_list = sorted(
-            alumni_list,
-            key=lambda x: x.get("Industry_experiences", 0) or 0,
-            reverse=reverse_sort
-        )
 
-    return {"total": len(alumni_list), "results": alumni_list}
 
+# 🔍 Full-text search over names, organization, position and location
+@app.get("/search")
+def search_alumni(
+    q: str = Query(..., min_length=1, description="Search text (e.g., 'kotak manager')"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    fields: Optional[str] = FIELDS_QUERY
+):
+    plan = projection_plan(fields)
+    total, hits = store.search(q, limit, plan)
+    return {
+        "total": total,
+        "results": [
+            {"score": round(score, 4), "alumni": record}
+            for record, score in hits
+        ],
+    }
+
+
+# 🔍 Typo-tolerant name lookup (e.g., "satyjit yadv")
+@app.get("/search/fuzzy")
+def fuzzy_search_alumni(
+    name: str = Query(..., min_length=1, description="First name and/or surname, possibly misspelled"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    min_score: float = Query(0.3, gt=0, le=1, description="Minimum trigram similarity per name word"),
+    fields: Optional[str] = FIELDS_QUERY
+):
+    plan = projection_plan(fields)
+    hits = store.fuzzy_names(name, limit, min_score, plan)
+    return {
+        "results": [
+            {"score": round(score, 4), "alumni": record}
+            for record, score in hits
+        ],
+    }
+
+
+# ⌨️ Type-ahead suggestions for names, organizations and skills
+@app.get("/autocomplete")
+def autocomplete(
+    prefix: str = Query(..., min_length=1, description="What the user has typed so far"),
+    field: Literal["name", "organization", "skill"] = Query("name", description="What to suggest"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    return {
+        "suggestions": [
+            {"value": value, "count": count} for value, count in store.complete(field, prefix, limit)
+        ]
+    }
+
+
+# 🧠 Who knows what: boolean queries over the skill / programming language columns
+@app.get("/skills/search")
+def search_skills(
+    all_of: List[str] = Query([], alias="all", description="Skills the alumni must all have (e.g., Python, Power BI)"),
+    any_of: List[str] = Query([], alias="any", description="At least one of these skills"),
+    none_of: List[str] = Query([], alias="none", description="None of these skills"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all results if omitted)"),
+    offset: int = Query(0, ge=0, description="Records to skip"),
+    fields: Optional[str] = FIELDS_QUERY
+):
+    if not (all_of or any_of or none_of):
+        raise HTTPException(status_code=400, detail="Give at least one of all, any or none")
+    plan = projection_plan(fields)
+    total, results = store.skill_query(all_of, any_of, none_of, offset, limit, plan)
+    return {"total": total, "results": results}
+
+
+# 📊 Sidebar counts per batch / gender / organization / location / skill
+@app.get("/facets")
+def facets(
+    batch: Optional[str] = Query(None, description="Only count alumni of this batch"),
+    gender: Optional[str] = Query(None, description="Only count alumni of this gender"),
+    organization: Optional[str] = Query(None, description="Only count alumni at this organization"),
+    location: Optional[str] = Query(None, description="Only count alumni in this location"),
+    skill: List[str] = Query([], description="Only count alumni having all these skills"),
+    facet: List[Literal["batch", "gender", "organization", "location", "skill"]] = Query(
+        ["batch", "gender", "organization", "location", "skill"], description="Facets to return"
+    ),
+    limit: int = Query(20, ge=1, le=500, description="Maximum values per facet")
+):
+    selected = {
+        name: value
+        for name, value in (("batch", batch), ("gender", gender), ("organization", organization), ("location", location))
+        if value
+    }
+    total, counts = store.facet_counts(selected, skill, facet, limit)
+    return {
+        "total": total,
+        "facets": {
+            name: [{"value": value, "count": count} for value, count in pairs]
+            for name, pairs in counts.items()
+        },
+    }
+
+
+# 📈 Experience / headcount statistics per batch and gender, plus employer concentration
+@app.get("/stats")
+def stats(
+    top_organizations: int = Query(10, ge=1, le=100, description="How many leading organizations to list")
+):
+    return store.stats(top_organizations)
 
 
 @app.get("/alumni/{alumni_id}")
 def get_alumni(
+    request: Request,
     alumni_id: str = Path(
         ..., 
         description="ID of the alumni in the database", 
         example="001-2008-10"
-    )
+    ),
+    fields: Optional[str] = FIELDS_QUERY
 ):
-    data = load_data()
-    alumni_records = data.get("alumni", {})
+    plan = projection_plan(fields)
+    version = store.version(alumni_id)
 
-    if alumni_id not in alumni_records:
+    if version is None:
         raise HTTPException(status_code=404, detail="Alumni not found")
 
-    return alumni_records[alumni_id]
+    def build():
+        alumni = store.get(alumni_id, plan)
+        if not alumni:
+            raise HTTPException(status_code=404, detail="Alumni not found")
+        return alumni
+
+    return cached_json(request, ("/alumni", alumni_id, plan), version, build, alumni_id)
 
 
 
@@ -272,37 +652,33 @@ async def update_alumni(
     updated_data: Alumni
 ):
     try:
-        data = load_data()
-        alumni_records = data.get("alumni", {})
+        existing = store.get(alumni_id)
 
-        if alumni_id not in alumni_records:
+        if not existing:
             raise HTTPException(status_code=404, detail="Alumni not found")
 
         # Preserve ID & batch (don’t allow change)
         updated_dict = updated_data.model_dump()
         updated_dict["id"] = alumni_id
-        updated_dict["batch"] = alumni_records[alumni_id]["batch"]
+        updated_dict["batch"] = existing["batch"]
 
         # Preserve profile photo if not updated
         if not updated_dict.get("profile_photo"):
-            updated_dict["profile_photo"] = alumni_records[alumni_id].get("profile_photo")
+            updated_dict["profile_photo"] = existing.get("profile_photo")
 
         # Save back
-        data["alumni"][alumni_id] = updated_dict
-        save_data(data)
+        await store.put(updated_dict)
 
-        return {"message": "Alumni updated successfully", "alumni": updated_dict}
+        # ✅ Echo the record as stored (trimmed by the store)
+        return {"message": "Alumni updated successfully", "alumni": store.get(alumni_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/alumni/{alumni_id}")
-def delete_alumni(alumni_id: str):
-    data = load_data()
-    store = data.get("alumni", {})
-
+async def delete_alumni(alumni_id: str):
     # find & remove record
-    record = store.pop(alumni_id, None)
+    record = await store.delete(alumni_id)
     if record is None:
         raise HTTPException(status_code=404, detail="Alumni not found")
 
@@ -312,10 +688,8 @@ def delete_alumni(alumni_id: str):
         photo_path = os.path.join(PHOTO_DIR, photo)
         if os.path.isfile(photo_path):
             os.remove(photo_path)
+            photo_archive.invalidate()
 
-    # save back
-    data["alumni"] = store
-    save_data(data)
     return {"message": f"Alumni {alumni_id} deleted successfully"}
 
 
@@ -323,8 +697,7 @@ def delete_alumni(alumni_id: str):
 # 🔄 Update photo (replaces old one safely)
 @app.put("/update-photo/{alumni_id}")
 async def update_photo(alumni_id: str, new_photo: UploadFile = File(...)):
-    data = load_data()
-    alumni = data.get("alumni", {}).get(alumni_id)
+    alumni = store.get(alumni_id)
 
     if not alumni:
         raise HTTPException(status_code=404, detail="Alumni not found")
@@ -337,9 +710,9 @@ async def update_photo(alumni_id: str, new_photo: UploadFile = File(...)):
         contents = await new_photo.read()
         with open(photo_path, "wb") as buffer:
             buffer.write(contents)
+        photo_archive.invalidate()
 
-        alumni["profile_photo"] = photo_filename
-        save_data(data)
+        await store.put({**alumni, "profile_photo": photo_filename})
 
         return {"message": "Photo updated successfully", "filename": photo_filename}
     except Exception as e:
@@ -347,17 +720,16 @@ async def update_photo(alumni_id: str, new_photo: UploadFile = File(...)):
 
 
 @app.put("/update_id/{old_id}")
-def update_alumni_id(old_id: str, new_batch: str = Body(..., embed=True)):
-    data = load_data()
-    alumni = data.get("alumni", {})
+async def update_alumni_id(old_id: str, new_batch: str = Body(..., embed=True)):
+    alumni = store.get(old_id)
 
-    if old_id not in alumni:
+    if not alumni:
         raise HTTPException(status_code=404, detail="Alumni not found")
 
     # Create new Alumni with new batch
     alumni_obj = Alumni.create(
         batch=new_batch,
-        **{k: v for k, v in alumni[old_id].items() if k not in ["id", "batch"]}
+        **{k: v for k, v in alumni.items() if k not in ["id", "batch"]}
     )
     new_id = alumni_obj.id
 
@@ -367,20 +739,18 @@ def update_alumni_id(old_id: str, new_batch: str = Body(..., embed=True)):
     
     if os.path.exists(old_photo_path):
         os.rename(old_photo_path, new_photo_path)
+        photo_archive.invalidate()
         alumni_obj = alumni_obj.model_copy(update={"profile_photo": f"{new_id}.jpg"})
 
     # Update JSON
-    del alumni[old_id]
-    alumni[new_id] = alumni_obj.model_dump()
-    save_data(data)
+    await store.rename(old_id, alumni_obj.model_dump())
 
     return {"message": f"Alumni ID updated from {old_id} to {new_id}"}
 
 # 👀 View photo
 @app.get("/view_photo/{alumni_id}")
 async def view_photo(alumni_id: str):
-    data = load_data()
-    alumni = data.get("alumni", {}).get(alumni_id)
+    alumni = store.get(alumni_id)
 
     if not alumni:
         raise HTTPException(status_code=404, detail="Alumni not found")
@@ -395,35 +765,58 @@ async def view_photo(alumni_id: str):
 
 
 @app.get("/download/json")
-def download_json():
-    file_path = "alumni_data.json"
-    if os.path.exists(file_path):
-        return FileResponse(file_path, media_type="application/json", filename="alumni_data.json")
-    return {"error": "File not found"}
-
-
-# API to download all photos as a ZIP
-@app.get("/download/photos")
-def download_all_photos():
-    zip_path = "all_photos.zip"
-
-    # Create a zip file
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for root, dirs, files in os.walk(PHOTO_DIR):
-            for file in files:
-                file_path = os.path.join(root, file)
-                zipf.write(file_path, arcname=file)  # arcname keeps only file name in zip
+def download_json(
+    fmt: Literal["json", "ndjson"] = FORMAT_QUERY,
+    pretty: bool = Query(False, description="Indented, human-readable JSON (built in memory, not streamed)"),
+):
+    if pretty:
+        return Response(
+            codec.dumps(store.as_dict(), pretty=True),
+            media_type="application/json",
+            headers={"Content-Disposition": 'attachment; filename="alumni_data.json"'},
+        )
 
-    # Send the zip file as response
-    if os.path.exists(zip_path):
-        return FileResponse(zip_path, media_type="application/zip", filename="all_photos.zip")
-    return {"error": "No photos found"}
+    # Same layout as the snapshot file, straight from memory (no checkpoint needed). seq
+    # is taken before the records, so restoring the file replays nothing it lacks
+    filename = "alumni_data.ndjson" if fmt == "ndjson" else "alumni_data.json"
+    def extra() -> dict:
+        seq, batch_counts = store.counters()
+        return {"batch_counts": batch_counts, "seq": seq}
+
+    chunks = directory_chunks(fmt, None, extra)
+    return StreamingResponse(
+        chunks,
+        media_type=NDJSON if fmt == "ndjson" else "application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
-import os
-import zipfile
-import io
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+# API to download photos as a ZIP: all of them (a ready-made archive, updated only when
+# photos change) or just those of the alumni matching the filters (streamed)
+@app.get("/download/photos")
+def download_all_photos(filters: Filters = Depends(alumni_filters)):
+    if filters.key == Filters().key:
+        archive = photo_archive.open()
+        return StreamingResponse(
+            read_blocks(archive),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": 'attachment; filename="all_photos.zip"',
+                "Content-Length": str(os.fstat(archive.fileno()).st_size),
+            },
+        )
 
-    
+    # Matching alumni come from the indexes; only their photos are read
+    _, records, _ = store.query(filters, SortSpec.parse(None), fields=("profile_photo",))
+    files = {}
+    for record in records:
+        # Only files directly inside PHOTO_DIR, whatever the record says
+        name = os.path.basename(record["profile_photo"] or "")
+        path = os.path.join(PHOTO_DIR, name)
+        if name and os.path.isfile(path):
+            files[name] = path
+    return StreamingResponse(
+        stream_zip(files.items()),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="alumni_photos.zip"'},
+    )
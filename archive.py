@@ -0,0 +1,177 @@
+"""ZIP archives of profile photos for /download/photos.
+
+Archives are generated straight into the response: zipfile writes into an
+in-memory sink that the generator empties after every block, so memory
+stays at one block whatever the number of photos, and nothing is written
+to disk. Photos are JPEGs that are already compressed, so entries are
+ZIP_STORED - deflating them again costs CPU and saves next to nothing.
+
+The output is not seekable, so each entry's CRC and sizes follow its data
+in a data descriptor (as zip streamers do); every common unzip tool
+reads these archives.
+
+The full archive is also kept on disk (PhotoArchive) next to a manifest
+of the photos it holds (name, size, mtime). The photo endpoints mark it
+stale; the next download compares the photo directory with the manifest
+and, if anything changed, appends the new photos (when photos were only
+added) or rebuilds it. Otherwise the download is just the ready file. The
+file is opened before the lock is released, so a download always streams
+one complete archive even if a refresh swaps in a new one meanwhile.
+"""
+
+import os
+import shutil
+import threading
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from codec import codec
+
+# Bytes read from a photo (and handed to the client) at a time
+BLOCK_SIZE = 64 * 1024
+
+
+class _Sink:
+    """Write-only stream collecting what zipfile writes until the generator takes it."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def photo_files(photo_dir: str) -> List[Tuple[str, str]]:
+    """(name in the archive, path) of every file under photo_dir, by name."""
+    files = []
+    for root, _, names in os.walk(photo_dir):
+        files.extend((name, os.path.join(root, name)) for name in names)
+    return sorted(files)
+
+
+def stream_zip(files: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """Yield a ZIP_STORED archive of `files` ((arcname, path) pairs) block by block."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        for arcname, path in files:
+            try:
+                src = open(path, "rb")
+            except FileNotFoundError:
+                # Deleted since the listing was made
+                continue
+            with src:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_STORED
+                with zf.open(info, "w") as dest:
+                    while True:
+                        block = src.read(BLOCK_SIZE)
+                        if not block:
+                            break
+                        dest.write(block)
+                        yield sink.take()
+            yield sink.take()
+    # Central directory
+    yield sink.take()
+
+
+def read_blocks(f: BinaryIO) -> Iterator[bytes]:
+    """Yield the rest of `f` block by block, closing it at the end."""
+    with f:
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+# Photo name -> (size, mtime in ns)
+Manifest = Dict[str, Tuple[int, int]]
+
+
+class PhotoArchive:
+    """ZIP of the whole photo directory kept at `path`, brought up to date on demand."""
+
+    def __init__(self, photo_dir: str, path: str):
+        self.photo_dir = photo_dir
+        self.path = path
+        self.manifest_path = path + ".manifest"
+        self._manifest: Optional[Manifest] = None
+        self._dirty = True
+        self._dir_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Note that photos changed; the archive is checked on the next download."""
+        self._dirty = True
+
+    def open(self) -> BinaryIO:
+        """An archive matching the photo directory, updated first if needed, opened for reading."""
+        with self._lock:
+            # Changes made behind the API's back still move the directory mtime
+            # (adds, deletes and renames do; in-place overwrites don't)
+            dir_mtime = os.stat(self.photo_dir).st_mtime_ns
+            if self._dirty or dir_mtime != self._dir_mtime or not os.path.exists(self.path):
+                # Cleared first, so an invalidate() during the refresh isn't lost
+                self._dirty = False
+                self._dir_mtime = dir_mtime
+                try:
+                    self._refresh()
+                except BaseException:
+                    # Try again on the next download instead of serving the old archive for good
+                    self._dirty = True
+                    raise
+            # Opened under the lock: a later refresh replaces the path, not this file
+            return open(self.path, "rb")
+
+    def _saved_manifest(self) -> Optional[Manifest]:
+        if self._manifest is None and os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "rb") as f:
+                    self._manifest = {name: tuple(stat) for name, stat in codec.loads(f.read()).items()}
+            except (OSError, ValueError):
+                return None
+        return self._manifest
+
+    def _refresh(self) -> None:
+        files, manifest = [], {}
+        for arcname, path in photo_files(self.photo_dir):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((arcname, path))
+            manifest[arcname] = (stat.st_size, stat.st_mtime_ns)
+
+        saved = self._saved_manifest() if os.path.exists(self.path) else None
+        if saved == manifest:
+            return
+
+        tmp_path = self.path + ".tmp"
+        if saved is not None and all(manifest.get(name) == stat for name, stat in saved.items()):
+            # Only additions: copy the archive (a kernel-side copy) and append the new photos
+            shutil.copyfile(self.path, tmp_path)
+            mode, todo = "a", [(a, p) for a, p in files if a not in saved]
+        else:
+            mode, todo = "w", files
+        with zipfile.ZipFile(tmp_path, mode, compression=zipfile.ZIP_STORED) as zf:
+            for arcname, path in todo:
+                zf.write(path, arcname)
+
+        # Without a manifest the archive is rebuilt, so a crash between these
+        # steps can't pair the new archive with the old manifest
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        os.replace(tmp_path, self.path)
+        with open(self.manifest_path + ".tmp", "wb") as f:
+            f.write(codec.dumps(manifest))
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+        self._manifest = manifest
@@ -0,0 +1,349 @@
+"""Persistence backends for the alumni store.
+
+AlumniStore keeps every record in memory and hands each group of mutations
+to a backend to make it durable. Two backends are available:
+
+* JsonBackend - alumni_data.json snapshot plus an append-only journal. Each
+  change is one journal line; the journal is periodically compacted into
+  the snapshot, and startup replays journal entries newer than it.
+  Snapshots are written to a temp file, fsynced and atomically renamed into
+  place. The previous snapshot is kept as a .bak hard link and the previous
+  journal segment as .prev, so a damaged snapshot can be recovered from the
+  one before it.
+* SqliteBackend - one row per alumni in a WAL-mode SQLite database, with
+  indexed columns for the fields we filter and sort on.
+
+Mutations are passed around as small dicts ("ops"):
+    {"op": "put", "record": {...}}
+    {"op": "delete", "id": "..."}
+    {"op": "rename", "old_id": "...", "record": {...}}
+each stamped with a sequence number and the batch counters.
+
+SqliteBackend imports the JSON directory on its first start; run
+`python backends.py migrate` to do that explicitly.
+
+All JSON is encoded and decoded by codec.py.
+"""
+
+import os
+import shutil
+import argparse
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from codec import codec
+
+
+# Compact the journal into the snapshot after this many entries
+COMPACT_EVERY = int(os.environ.get("ALUMNI_COMPACT_EVERY", "1000"))
+
+
+def empty_state() -> dict:
+    return {"alumni": {}, "batch_counts": {}, "seq": 0}
+
+
+def apply_op(records: Dict[str, dict], op: dict) -> None:
+    kind = op["op"]
+    if kind == "put":
+        records[op["record"]["id"]] = op["record"]
+    elif kind == "delete":
+        records.pop(op["id"], None)
+    elif kind == "rename":
+        records.pop(op["old_id"], None)
+        records[op["record"]["id"]] = op["record"]
+
+
+def _fsync_dir(path: str) -> None:
+    # Make a rename durable; not supported on every platform
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_snapshot(path: str) -> dict:
+    """Load a snapshot, falling back to the previous one if it is unreadable."""
+    backup = path + ".bak"
+    if not os.path.exists(path) and not os.path.exists(backup):
+        return empty_state()
+    errors = []
+    for candidate in (path, backup):
+        try:
+            with open(candidate, "rb") as f:
+                return codec.loads(f.read())
+        except (OSError, ValueError) as e:
+            errors.append(f"{candidate}: {e}")
+    # Refuse to start empty; the next save would wipe the directory
+    raise RuntimeError("No readable alumni snapshot (" + "; ".join(errors) + ")")
+
+
+def write_snapshot(path: str, data: dict) -> None:
+    """Atomically replace the snapshot at path, keeping the old one as path.bak."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(codec.dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
+
+    if os.path.exists(path):
+        backup = path + ".bak"
+        if os.path.exists(backup):
+            os.remove(backup)
+        try:
+            os.link(path, backup)
+        except OSError:
+            shutil.copy2(path, backup)
+
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+class Journal:
+    """Append-only log of alumni mutations, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Segment retired by the last compaction, needed if we fall back to the .bak snapshot
+        self.prev_path = path + ".prev"
+        self.entries = 0
+        self.failed = False
+        self._file = None
+
+    @staticmethod
+    def _read_segment(path: str):
+        ops, good = [], 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        ops.append(codec.loads(line))
+                    except ValueError:
+                        break
+                    good += len(line)
+        return ops, good
+
+    def read(self) -> List[dict]:
+        previous, _ = self._read_segment(self.prev_path)
+        ops, good = self._read_segment(self.path)
+        if os.path.exists(self.path) and good < os.path.getsize(self.path):
+            # A torn last line from a crash mid-append was never acknowledged; drop it
+            # so new entries don't get glued onto the partial one
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        self.entries = len(ops)
+        return previous + ops
+
+    def append(self, ops: List[dict]) -> None:
+        if self.failed:
+            raise RuntimeError("The journal could not be repaired after a failed write; restart the server")
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        start = os.fstat(self._file.fileno()).st_size
+        try:
+            self._file.write(b"".join(codec.dumps(op) + b"\n" for op in ops))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except BaseException:
+            # The store won't apply these ops, so they must not be replayed either
+            self._discard(start)
+            raise
+        self.entries += len(ops)
+
+    def _discard(self, size: int) -> None:
+        """Cut the journal back to `size` bytes after a failed append."""
+        try:
+            self.close()
+        except OSError:
+            self._file = None
+        try:
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+                os.fsync(f.fileno())
+        except OSError:
+            # Memory and disk may now disagree: take no more writes until restarted
+            self.failed = True
+
+    def rotate(self) -> None:
+        """Retire the current segment to .prev and start an empty one."""
+        self.close()
+        if os.path.exists(self.path):
+            os.replace(self.path, self.prev_path)
+            _fsync_dir(self.path)
+        self.entries = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StorageBackend(ABC):
+    """Durable home for the alumni records; reads never reach it after load()."""
+
+    @abstractmethod
+    def load(self) -> dict:
+        """Return {"alumni": ..., "batch_counts": ..., "seq": ...} as last persisted."""
+
+    @abstractmethod
+    def write(self, ops: List[dict]) -> None:
+        """Durably record a group of ops (called from a worker thread)."""
+
+    @property
+    def needs_checkpoint(self) -> bool:
+        return False
+
+    def checkpoint(self, state: dict) -> None:
+        """Fold everything written so far into the backend's base copy."""
+
+    def close(self, state: dict) -> None:
+        pass
+
+
+class JsonBackend(StorageBackend):
+    def __init__(self, data_file: str, journal_file: str):
+        self.data_file = data_file
+        self.journal = Journal(journal_file)
+
+    def load(self) -> dict:
+        state = read_snapshot(self.data_file)
+        records = dict(state.get("alumni", {}))
+        batch_counts = {k: int(v) for k, v in state.get("batch_counts", {}).items()}
+        seq = int(state.get("seq", 0))
+
+        # Replay whatever was journaled after the snapshot was taken
+        for op in self.journal.read():
+            if op["seq"] > seq:
+                apply_op(records, op)
+                batch_counts.update(op.get("batch_counts", {}))
+                seq = op["seq"]
+        return {"alumni": records, "batch_counts": batch_counts, "seq": seq}
+
+    def write(self, ops: List[dict]) -> None:
+        self.journal.append(ops)
+
+    @property
+    def needs_checkpoint(self) -> bool:
+        return self.journal.entries >= COMPACT_EVERY
+
+    def checkpoint(self, state: dict) -> None:
+        write_snapshot(self.data_file, state)
+        self.journal.rotate()
+
+    def close(self, state: dict) -> None:
+        if self.journal.entries:
+            self.checkpoint(state)
+        self.journal.close()
+
+
+class SqliteBackend(StorageBackend):
+    # Columns pulled out of the record so SQLite can index them
+    INDEXED = ("batch", "gender", "Industry_experiences", "current_organization")
+
+    def __init__(self, db_file: str, migrate_from: Optional[JsonBackend] = None):
+        self.db_file = db_file
+        self.migrate_from = migrate_from
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Writes come from the committer's worker threads, one group at a time
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alumni ("
+                " id TEXT PRIMARY KEY,"
+                " batch TEXT,"
+                " gender TEXT,"
+                " Industry_experiences REAL,"
+                " current_organization TEXT,"
+                " data TEXT NOT NULL)"
+            )
+            for column in self.INDEXED:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_alumni_{column} ON alumni ({column})")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _row(self, record: dict) -> tuple:
+        return (record["id"], *(record.get(c) for c in self.INDEXED), codec.dumps(record).decode())
+
+    def load(self) -> dict:
+        conn = self._connect()
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if "seq" not in meta and self.migrate_from is not None:
+            # First start against a fresh database: import the JSON directory once
+            self.import_state(self.migrate_from.load())
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+
+        records = {row_id: codec.loads(data) for row_id, data in conn.execute("SELECT id, data FROM alumni")}
+        batch_counts = {k: int(v) for k, v in codec.loads(meta.get("batch_counts", "{}")).items()}
+        return {"alumni": records, "batch_counts": batch_counts, "seq": int(meta.get("seq", 0))}
+
+    def import_state(self, state: dict) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM alumni")
+            conn.executemany(
+                "INSERT INTO alumni VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(r) for r in state.get("alumni", {}).values()],
+            )
+            self._write_meta(conn, state.get("batch_counts", {}), state.get("seq", 0))
+
+    def write(self, ops: List[dict]) -> None:
+        conn = self._connect()
+        # One transaction (and one WAL sync) per group of ops
+        with conn:
+            conn.execute("BEGIN")
+            for op in ops:
+                if op["op"] in ("delete", "rename"):
+                    conn.execute("DELETE FROM alumni WHERE id = ?", (op.get("id") or op["old_id"],))
+                if op["op"] in ("put", "rename"):
+                    conn.execute("INSERT OR REPLACE INTO alumni VALUES (?, ?, ?, ?, ?, ?)", self._row(op["record"]))
+            self._write_meta(conn, ops[-1].get("batch_counts", {}), ops[-1]["seq"])
+
+    @staticmethod
+    def _write_meta(conn: sqlite3.Connection, batch_counts: dict, seq: int) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("batch_counts", codec.dumps(batch_counts).decode()), ("seq", str(seq))],
+        )
+
+    def checkpoint(self, state: dict) -> None:
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self, state: dict) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def migrate_json_to_sqlite(data_file: str, journal_file: str, db_file: str) -> int:
+    """Copy the JSON snapshot (plus pending journal entries) into a SQLite database."""
+    source = JsonBackend(data_file, journal_file)
+    state = source.load()
+    backend = SqliteBackend(db_file)
+    backend.import_state(state)
+    backend.close(state)
+    return len(state["alumni"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alumni storage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Copy the JSON directory into SQLite")
+    migrate.add_argument("--data-file", default="alumni_data.json")
+    migrate.add_argument("--journal-file", default="alumni_journal.jsonl")
+    migrate.add_argument("--db-file", default="alumni.db")
+    args = parser.parse_args()
+
+    count = migrate_json_to_sqlite(args.data_file, args.journal_file, args.db_file)
+    print(f"Migrated {count} alumni into {args.db_file}")
@@ -0,0 +1,59 @@
+"""JSON encoding: the old stdlib path vs each codec in codec.py.
+
+Times, on a synthetic directory:
+- snapshot write: json.dump(indent=4), as the original save_data() did,
+  vs codec.dumps
+- snapshot read: json.load vs codec.loads
+- /view response: FastAPI's default (jsonable_encoder + json.dumps) vs
+  codec.dumps, as the response cache and CodecJSONResponse use it
+
+    python -m benchmarks.json_codec [--count 100000]
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.synthetic import generate
+from codec import CODECS
+
+
+def timed(fn, repeat: int = 3):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    state = {"alumni": generate(args.count), "batch_counts": {}, "seq": 0}
+    view = {"alumni": state["alumni"], "batch_counts": {}}
+    print(f"{args.count} alumni")
+
+    old_text, write = timed(lambda: json.dumps(state, indent=4))
+    _, read = timed(lambda: json.loads(old_text))
+    _, respond = timed(lambda: json.dumps(
+        jsonable_encoder(view), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8"))
+    print(f"{'stdlib, indent=4 (old)':24} write {write:6.3f}s  read {read:6.3f}s  "
+          f"/view {respond:6.3f}s  {len(old_text.encode()) / 2**20:6.1f} MiB")
+
+    for name, codec in CODECS.items():
+        data, write = timed(lambda: codec.dumps(state))
+        _, read = timed(lambda: codec.loads(data))
+        _, respond = timed(lambda: codec.dumps(view))
+        print(f"{name:24} write {write:6.3f}s  read {read:6.3f}s  "
+              f"/view {respond:6.3f}s  {len(data) / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Memory per record: dict-of-dicts vs the columnar AlumniTable.
+
+Both layouts are built from the same JSON text, the way the store loads
+its snapshot, and measured with tracemalloc once the parsed JSON is gone.
+
+    python -m benchmarks.memory [--count 100000]
+
+Exits non-zero if the columnar table needs more than
+TARGET_BYTES_PER_RECORD per alumni.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import as_json, generate
+from columns import AlumniTable
+
+
+TARGET_BYTES_PER_RECORD = 400
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def build_table(text: str) -> AlumniTable:
+    table = AlumniTable()
+    table.load(json.loads(text)["alumni"])
+    return table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text = as_json(generate(args.count))
+    records, dict_bytes, dict_seconds = measure(lambda: json.loads(text)["alumni"])
+    del records
+    table, table_bytes, table_seconds = measure(lambda: build_table(text))
+
+    per_dict, per_row = dict_bytes / args.count, table_bytes / args.count
+    print(f"{args.count} alumni")
+    print(f"dict-of-dicts  {per_dict:8.0f} B/record  {dict_bytes / 2**20:7.1f} MiB  load {dict_seconds:.2f}s")
+    print(f"AlumniTable    {per_row:8.0f} B/record  {table_bytes / 2**20:7.1f} MiB  load {table_seconds:.2f}s")
+    print(f"ratio          {per_row / per_dict:8.2f}    (target <= {TARGET_BYTES_PER_RECORD} B/record)")
+    return 0 if per_row <= TARGET_BYTES_PER_RECORD else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Synthetic alumni directories for the benchmarks, shaped like alumni_data.json.
+
+Names, positions, locations and skills are drawn from the real file's
+values, organizations from a pool that grows with the directory, and
+every alumni gets a unique ID, LinkedIn URL and photo filename.
+"""
+
+import json
+import random
+from typing import Dict
+
+SOURCE = "alumni_data.json"
+
+
+def generate(count: int, seed: int = 0, source: str = SOURCE) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    with open(source, "r") as f:
+        real = list(json.load(f)["alumni"].values())
+    pools = {field: [r[field] for r in real] for field in real[0]}
+    organizations = pools["current_organization"] + [f"Company {i}" for i in range(max(1, count // 50))]
+    batches = [f"{year}-{(year + 2) % 100:02d}" for year in range(2002, 2025)]
+
+    records = {}
+    counts: Dict[str, int] = {}
+    for _ in range(count):
+        batch = rng.choice(batches)
+        counts[batch] = counts.get(batch, 0) + 1
+        alumni_id = f"{counts[batch]:03d}-{batch}"
+        record = {field: rng.choice(values) for field, values in pools.items()}
+        record.update(
+            id=alumni_id,
+            batch=batch,
+            linkedin_url=f"https://www.linkedin.com/in/alumni-{alumni_id}-{rng.randrange(10**6)}/",
+            current_organization=rng.choice(organizations),
+            Industry_experiences=round(rng.uniform(0, 30), 1) if rng.random() > 0.05 else None,
+            profile_photo=f"{alumni_id}.jpg",
+        )
+        records[alumni_id] = record
+    return records
+
+
+def as_json(records: Dict[str, dict]) -> str:
+    return json.dumps({"alumni": records, "batch_counts": {}})
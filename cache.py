@@ -0,0 +1,103 @@
+"""LRU cache of serialized JSON response bodies.
+
+Read endpoints that are polled a lot (/view, /view/page, /sort_alumni,
+/alumni/{alumni_id}) keep the encoded bytes of their responses here,
+keyed by endpoint and normalized query parameters, so a repeated request
+skips the query, materialization and JSON encoding entirely. A gzipped
+copy is made the first time a client accepting gzip asks for the entry.
+
+Every entry remembers the store sequence number it was built at and is
+only served while that is still the current version of what it covers:
+the whole directory, or a single record for entries tied to an alumni
+ID. On top of that AlumniStore calls invalidate() with the IDs touched by
+each mutation, which drops stale entries right away instead of leaving
+them to age out of the LRU.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+# Bodies smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class CachedBody:
+    __slots__ = ("key", "seq", "alumni_id", "body", "gzipped")
+
+    def __init__(self, key: Hashable, seq: int, alumni_id: Optional[str], body: bytes):
+        self.key = key
+        self.seq = seq
+        self.alumni_id = alumni_id
+        self.body = body
+        # Set by ResponseCache.gzipped()
+        self.gzipped: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzipped or b"")
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        # Bytes held by the entries (bodies plus gzipped copies), kept as they come and go
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, seq: int) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.seq != seq:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, seq: int, body: bytes, alumni_id: Optional[str] = None) -> CachedBody:
+        """Cache `body` as the response for `key` at version `seq` (of `alumni_id`, or of everything)."""
+        entry = CachedBody(key, seq, alumni_id, body)
+        if len(body) <= self.max_bytes:
+            with self._lock:
+                self._drop(key)
+                self._entries[key] = entry
+                self._size += entry.size
+                self._evict()
+        return entry
+
+    def gzipped(self, entry: CachedBody) -> Optional[bytes]:
+        """Compressed body of `entry`, made on first use (None if the body is too small to bother)."""
+        if len(entry.body) < GZIP_MIN_BYTES:
+            return None
+        if entry.gzipped is None:
+            gzipped = gzip.compress(entry.body, compresslevel=6)
+            with self._lock:
+                if entry.gzipped is None:
+                    entry.gzipped = gzipped
+                    if self._entries.get(entry.key) is entry:
+                        self._size += len(gzipped)
+                        self._evict()
+        return entry.gzipped
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
+
+    def invalidate(self, alumni_ids: Iterable[str]) -> None:
+        """Drop everything covering the whole directory, plus the entries of these alumni."""
+        alumni_ids = set(alumni_ids)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.alumni_id is None or e.alumni_id in alumni_ids]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
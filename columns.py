@@ -0,0 +1,293 @@
+"""Columnar storage for the alumni records.
+
+Instead of one dict per alumni (17 keys, a fresh string object for every
+value), AlumniTable keeps one column per field, indexed by the alumni's
+row number (indexes.RowIds):
+
+- fields whose values repeat across the directory (batch, gender,
+  organization, position, location, names, skills) are integer codes into
+  a table of distinct values (one per column; the six skill columns
+  share one),
+- Industry_experiences is a flat array of doubles (NaN when missing),
+- the few values unique to each alumni (LinkedIn URL, photo filename) are
+  plain lists, and the id column is RowIds' own row -> id list.
+
+Every record is normalized on the way in (load, create, update): text is
+trimmed and categorical values are interned, so the indexes and filters
+compare the same string objects. Spelling and case are kept exactly as
+given; matching that ignores case (search, skills, autocomplete) is done
+by the indexes.
+
+Records are read through AlumniRow, a two-slot view that behaves like the
+record dict it replaces (`row["batch"]`, `row.get(...)`, `dict(row)`), so
+indexes, filters and sort keys work on it unchanged. A view reads whatever
+is stored in its row *now*: materialize it with to_dict() before letting
+it outlive the store lock.
+
+python -m benchmarks.memory compares this layout with the dict-of-dicts.
+"""
+
+import math
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+from indexes import SKILL_FIELDS, RowIds
+
+
+# Record fields, in the order records are served
+FIELDS = (
+    "id", "firstname", "surname", "gender", "batch", "linkedin_url",
+    "current_organization", "current_position", "current_location", "Industry_experiences",
+    *SKILL_FIELDS,
+    "profile_photo",
+)
+# Values repeat across alumni, so these are stored as codes
+CATEGORICAL_FIELDS = (
+    "firstname", "surname", "gender", "batch",
+    "current_organization", "current_position", "current_location",
+    *SKILL_FIELDS,
+)
+FLOAT_FIELDS = ("Industry_experiences",)
+
+
+class Categories:
+    """Value <-> small integer code, for categorical columns."""
+
+    def __init__(self):
+        self.codes: Dict[Hashable, int] = {}
+        self.values: List[Hashable] = []
+
+    def code(self, value: Hashable) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class Symbols(Categories):
+    """Categories of text values, trimmed and interned."""
+
+    def __init__(self):
+        super().__init__()
+        # Code 0 is always None, so a zero-filled column is empty
+        self.code(None)
+
+    def canonical(self, value):
+        return sys.intern(value.strip()) if isinstance(value, str) else value
+
+    def code(self, value) -> int:
+        return super().code(self.canonical(value))
+
+
+class CategoryColumn:
+    def __init__(self, categories: Symbols):
+        self.categories = categories
+        self.codes = array("I")
+
+    def normalize(self, value):
+        return self.categories.canonical(value)
+
+    def grow(self, size: int) -> None:
+        self.codes.frombytes(bytes((size - len(self.codes)) * self.codes.itemsize))
+
+    def get(self, row: int):
+        return self.categories.values[self.codes[row]]
+
+    def set(self, row: int, value) -> None:
+        self.codes[row] = self.categories.code(value)
+
+    def clear(self, row: int) -> None:
+        self.codes[row] = 0
+
+
+class FloatColumn:
+    def __init__(self):
+        self.values = array("d")
+
+    def normalize(self, value) -> Optional[float]:
+        return None if value is None else float(value)
+
+    def grow(self, size: int) -> None:
+        self.values.extend(array("d", [math.nan]) * (size - len(self.values)))
+
+    def get(self, row: int) -> Optional[float]:
+        value = self.values[row]
+        return None if math.isnan(value) else value
+
+    def set(self, row: int, value: Optional[float]) -> None:
+        self.values[row] = math.nan if value is None else value
+
+    def clear(self, row: int) -> None:
+        self.values[row] = math.nan
+
+
+class TextColumn:
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+
+    def normalize(self, value):
+        return value.strip() if isinstance(value, str) else value
+
+    def grow(self, size: int) -> None:
+        self.values.extend([None] * (size - len(self.values)))
+
+    def get(self, row: int) -> Optional[str]:
+        return self.values[row]
+
+    def set(self, row: int, value: Optional[str]) -> None:
+        self.values[row] = value
+
+    def clear(self, row: int) -> None:
+        self.values[row] = None
+
+
+class IdColumn:
+    """The id column, read from RowIds (which already keeps every row's ID)."""
+
+    def __init__(self, rows: RowIds):
+        self.rows = rows
+
+    def normalize(self, value: str) -> str:
+        # IDs are lookup keys everywhere; they are used exactly as given
+        return value
+
+    def grow(self, size: int) -> None:
+        pass
+
+    def get(self, row: int) -> str:
+        return self.rows.id(row)
+
+    def set(self, row: int, value: str) -> None:
+        pass
+
+    def clear(self, row: int) -> None:
+        pass
+
+
+class AlumniRow(Mapping):
+    """Read-only view of one alumni's row, usable wherever a record dict is."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "AlumniTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field: str):
+        return self._table.columns[field].get(self._row)
+
+    def get(self, field: str, default=None):
+        column = self._table.columns.get(field)
+        return default if column is None else column.get(self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def to_dict(self, fields: Optional[Tuple[str, ...]] = None) -> dict:
+        """A plain dict of the record (or of just `fields`), for serializing."""
+        columns, row = self._table.columns, self._row
+        return {f: columns[f].get(row) for f in fields or FIELDS}
+
+    def __repr__(self) -> str:
+        return f"AlumniRow({self.to_dict()!r})"
+
+
+class AlumniTable:
+    """ID -> record mapping stored column by column; see the module docstring.
+
+    Supports the dict operations the store and backends.apply_op use
+    (get/[]/in/len/pop/assignment/values/items). Assigned records are
+    copied into the columns; reads return AlumniRow views. Row numbers
+    are shared with the bitmap indexes through `rows`.
+    """
+
+    def __init__(self):
+        self.rows = RowIds()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.columns = {}
+        skills = Symbols()
+        for field in FIELDS:
+            if field == "id":
+                self.columns[field] = IdColumn(self.rows)
+            elif field in SKILL_FIELDS:
+                self.columns[field] = CategoryColumn(skills)
+            elif field in CATEGORICAL_FIELDS:
+                self.columns[field] = CategoryColumn(Symbols())
+            elif field in FLOAT_FIELDS:
+                self.columns[field] = FloatColumn()
+            else:
+                self.columns[field] = TextColumn()
+        self._capacity = 0
+
+    def _ensure(self, row: int) -> None:
+        if row < self._capacity:
+            return
+        self._capacity = max(self._capacity * 2, row + 1, 64)
+        for column in self.columns.values():
+            column.grow(self._capacity)
+
+    def _write(self, row: int, record: dict) -> None:
+        self._ensure(row)
+        for field, column in self.columns.items():
+            column.set(row, column.normalize(record.get(field)))
+
+    def normalize(self, record: dict) -> dict:
+        """`record` as the table will store it (see the module docstring)."""
+        return {f: column.normalize(record.get(f)) for f, column in self.columns.items()}
+
+    def load(self, records: Dict[str, dict]) -> None:
+        """Replace the whole table (row numbers restart from 0, in `records` order)."""
+        # The RowIds object itself is kept: the bitmap indexes hold on to it
+        self.rows.rebuild(records)
+        self._clear()
+        self._ensure(len(records) - 1)
+        for row, record in enumerate(records.values()):
+            self._write(row, record)
+
+    # ---------- dict interface ----------
+
+    def __contains__(self, alumni_id: str) -> bool:
+        return alumni_id in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return (alumni_id for _, alumni_id in self.rows.live())
+
+    def __getitem__(self, alumni_id: str) -> AlumniRow:
+        return AlumniRow(self, self.rows.row(alumni_id))
+
+    def get(self, alumni_id: str, default=None) -> Optional[AlumniRow]:
+        return self[alumni_id] if alumni_id in self.rows else default
+
+    def values(self) -> Iterator[AlumniRow]:
+        return (AlumniRow(self, row) for row, _ in self.rows.live())
+
+    def items(self) -> Iterator[Tuple[str, AlumniRow]]:
+        return ((alumni_id, AlumniRow(self, row)) for row, alumni_id in self.rows.live())
+
+    def __setitem__(self, alumni_id: str, record: dict) -> None:
+        self._write(self.rows.assign(alumni_id), record)
+
+    def pop(self, alumni_id: str, default=None):
+        if alumni_id not in self.rows:
+            return default
+        row = self.rows.row(alumni_id)
+        record = AlumniRow(self, row).to_dict()
+        for column in self.columns.values():
+            column.clear(row)
+        self.rows.release(alumni_id)
+        return record
+
+    def to_dicts(self, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, dict]:
+        return {alumni_id: row.to_dict(fields) for alumni_id, row in self.items()}
+
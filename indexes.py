@@ -0,0 +1,315 @@
+"""In-memory secondary indexes over alumni records.
+
+AlumniStore keeps these up to date on every create/update/delete/ID change,
+so filtered reads only touch the matching records instead of scanning the
+whole directory.
+
+Bitmap indexes give every alumni a small row number (RowIds) and store,
+for each value, a Python int with the bits of the rows having it. AND/OR/NOT
+across values are then single integer operations.
+"""
+
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+SKILL_FIELDS = (
+    "software_skill_1", "software_skill_2", "software_skill_3",
+    "programming_lang_1", "programming_lang_2", "programming_lang_3",
+)
+
+
+class FieldIndex:
+    """Maps the value of one field (or a tuple of fields) to the set of alumni IDs having it."""
+
+    def __init__(self, *fields: str):
+        self.fields = fields
+        self._ids: Dict[Hashable, Set[str]] = {}
+
+    def key(self, record: dict) -> Hashable:
+        if len(self.fields) == 1:
+            return record.get(self.fields[0])
+        return tuple(record.get(f) for f in self.fields)
+
+    def add(self, record: dict) -> None:
+        self._ids.setdefault(self.key(record), set()).add(record["id"])
+
+    def remove(self, record: dict) -> None:
+        key = self.key(record)
+        ids = self._ids.get(key)
+        if ids is not None:
+            ids.discard(record["id"])
+            if not ids:
+                del self._ids[key]
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._ids = {}
+        for record in records:
+            self.add(record)
+
+    def lookup(self, value: Hashable) -> Set[str]:
+        return self._ids.get(value, set())
+
+    def count(self, value: Hashable) -> int:
+        return len(self._ids.get(value, ()))
+
+    def values(self):
+        return self._ids.keys()
+
+
+class SortedIndex:
+    """Alumni IDs kept ordered by (value of `field`, id), updated incrementally.
+
+    Missing values sort as `default`, matching how /sort_alumni has always
+    treated an empty Industry_experiences.
+    """
+
+    def __init__(self, field: str, default=0):
+        self.field = field
+        self.default = default
+        self._keys: List[Tuple] = []
+
+    def key(self, record: dict) -> Tuple:
+        value = record.get(self.field)
+        return (self.default if value is None else value, record["id"])
+
+    def add(self, record: dict) -> None:
+        insort(self._keys, self.key(record))
+
+    def remove(self, record: dict) -> None:
+        key = self.key(record)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._keys = sorted(self.key(r) for r in records)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def range(self, descending: bool = False, after: Optional[Tuple] = None) -> Iterator[Tuple]:
+        return keys_after(self._keys, descending, after)
+
+    def _bounds(self, low, high) -> Tuple[int, int]:
+        start = 0 if low is None else bisect_left(self._keys, (low,))
+        end = len(self._keys) if high is None else bisect_right(self._keys, (high, _TOP))
+        return start, max(start, end)
+
+    def count_between(self, low=None, high=None) -> int:
+        """Number of records with low <= value <= high (None = unbounded), in O(log n)."""
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def ids_between(self, low=None, high=None) -> List[str]:
+        start, end = self._bounds(low, high)
+        return [alumni_id for _, alumni_id in self._keys[start:end]]
+
+
+class _Top:
+    # Sorts after every ID, so (value, _TOP) bounds all keys with that value
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+def keys_after(keys: List[Tuple], descending: bool, after: Optional[Tuple]) -> Iterator[Tuple]:
+    """Iterate a sorted key list in either direction, starting just past `after`."""
+    if descending:
+        end = len(keys) if after is None else bisect_left(keys, after)
+        return (keys[i] for i in range(end - 1, -1, -1))
+    start = 0 if after is None else bisect_right(keys, after)
+    return (keys[i] for i in range(start, len(keys)))
+
+
+def bitmap_rows(bitmap: int) -> np.ndarray:
+    """Row numbers of the set bits of a (non-negative) bitmap, ascending.
+
+    Done in one pass over the bitmap's bytes; peeling bits off the int one
+    by one would copy the whole int for every match.
+    """
+    if not bitmap:
+        return np.empty(0, dtype=np.intp)
+    raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+def rows_bitmap(flags: np.ndarray) -> int:
+    """Bitmap with the bits set where the boolean array `flags` is True."""
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+class RowIds:
+    """Assigns each alumni ID a small, reusable row number for bitmap indexes."""
+
+    def __init__(self):
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        # Bits of every row currently in use
+        self.alive = 0
+
+    def assign(self, alumni_id: str) -> int:
+        row = self._rows.get(alumni_id)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._ids)
+            if row == len(self._ids):
+                self._ids.append(alumni_id)
+            else:
+                self._ids[row] = alumni_id
+            self._rows[alumni_id] = row
+            self.alive |= 1 << row
+        return row
+
+    def release(self, alumni_id: str) -> None:
+        row = self._rows.pop(alumni_id, None)
+        if row is not None:
+            self._ids[row] = None
+            self._free.append(row)
+            self.alive &= ~(1 << row)
+
+    def rebuild(self, ids: Iterable[str]) -> None:
+        self._ids = list(ids)
+        self._rows = {alumni_id: row for row, alumni_id in enumerate(self._ids)}
+        self._free = []
+        self.alive = (1 << len(self._ids)) - 1
+
+    def __contains__(self, alumni_id: str) -> bool:
+        return alumni_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def row(self, alumni_id: str) -> int:
+        return self._rows[alumni_id]
+
+    def id(self, row: int) -> Optional[str]:
+        return self._ids[row]
+
+    def live(self) -> Iterator[Tuple[int, str]]:
+        """(row, alumni ID) of every row in use, in row order."""
+        return ((row, alumni_id) for row, alumni_id in enumerate(self._ids) if alumni_id is not None)
+
+    def ids(self, bitmap: int) -> List[str]:
+        """Alumni IDs of the set bits, in row order."""
+        ids = self._ids
+        return [ids[row] for row in bitmap_rows(bitmap).tolist()]
+
+
+class BitmapIndex:
+    """Maps each key produced by `keys(record)` to a bitmap of the rows having it."""
+
+    def __init__(self, rows: RowIds, keys: Callable[[dict], Iterable[Hashable]]):
+        self.rows = rows
+        self.keys = keys
+        self._bitmaps: Dict[Hashable, int] = {}
+
+    def add(self, record: dict) -> None:
+        bit = 1 << self.rows.row(record["id"])
+        for key in set(self.keys(record)):
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bit
+
+    def remove(self, record: dict) -> None:
+        bit = 1 << self.rows.row(record["id"])
+        for key in set(self.keys(record)):
+            bitmap = self._bitmaps.get(key, 0) & ~bit
+            if bitmap:
+                self._bitmaps[key] = bitmap
+            else:
+                self._bitmaps.pop(key, None)
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._bitmaps = {}
+        for record in records:
+            self.add(record)
+
+    def bitmap(self, key: Hashable) -> int:
+        return self._bitmaps.get(key, 0)
+
+    def items(self):
+        return self._bitmaps.items()
+
+
+def facet_keys(field: str) -> Callable[[dict], List[str]]:
+    """Key function for a BitmapIndex over one text field, ignoring stray whitespace."""
+    def keys(record: dict) -> List[str]:
+        value = record.get(field)
+        return [value.strip()] if isinstance(value, str) and value.strip() else []
+    return keys
+
+
+# Skill cells hold lists like "SPSS, Excel, , SQL" or "PowerPoint - Microsoft Word"
+_SKILL_SEPARATORS = re.compile(r"[,;/|\n]|\s[-–]\s|–")
+_SKILL_NOISE = re.compile(r"[^\w+#]")
+
+
+def skill_key(skill: str) -> str:
+    """Normalised skill name: case-folded with spaces and punctuation dropped ("Power BI" == "PowerBI")."""
+    return _SKILL_NOISE.sub("", skill.casefold())
+
+
+def split_skills(record: dict) -> List[str]:
+    skills = []
+    for field in SKILL_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            skills.extend(s.strip() for s in _SKILL_SEPARATORS.split(value) if skill_key(s))
+    return skills
+
+
+class SkillIndex(BitmapIndex):
+    """Bitmap per normalised skill across the six skill/language columns."""
+
+    def __init__(self, rows: RowIds):
+        super().__init__(rows, lambda record: [skill_key(s) for s in split_skills(record)])
+        self._spellings: Dict[str, Dict[str, int]] = {}
+
+    def add(self, record: dict) -> None:
+        super().add(record)
+        for skill in split_skills(record):
+            spellings = self._spellings.setdefault(skill_key(skill), {})
+            spellings[skill] = spellings.get(skill, 0) + 1
+
+    def remove(self, record: dict) -> None:
+        super().remove(record)
+        for skill in split_skills(record):
+            key = skill_key(skill)
+            spellings = self._spellings.get(key, {})
+            if spellings.get(skill, 0) > 1:
+                spellings[skill] -= 1
+            else:
+                spellings.pop(skill, None)
+                if not spellings:
+                    self._spellings.pop(key, None)
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._spellings = {}
+        super().rebuild(records)
+
+    def display(self, key: str) -> str:
+        # Most common spelling of a normalised skill
+        spellings = self._spellings.get(key)
+        return max(spellings, key=spellings.get) if spellings else key
+
+    def match(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (), none_of: Iterable[str] = ()) -> int:
+        """Bitmap of alumni having every skill in all_of, at least one of any_of and none of none_of."""
+        result = self.rows.alive
+        for skill in all_of:
+            result &= self.bitmap(skill_key(skill))
+        any_of = list(any_of)
+        if any_of:
+            either = 0
+            for skill in any_of:
+                either |= self.bitmap(skill_key(skill))
+            result &= either
+        for skill in none_of:
+            result &= ~self.bitmap(skill_key(skill))
+        return result
@@ -0,0 +1,254 @@
+"""Filtering, multi-key sorting and pagination over the in-memory store.
+
+A query is a set of Filters (exact batch/gender, experience and batch
+year ranges, required skills) and a SortSpec (one or more fields, each asc or desc). The
+planner asks every index that can serve one of the filters how many
+records it would return - set sizes and bisect counts, so this is cheap -
+and starts from the smallest candidate set, checking the remaining
+conditions record by record. A single-field sort that has its own sorted
+index is read straight off that index; anything else sorts just the
+candidates.
+
+Records are always ordered by the sort fields and then by ID (in the
+direction of the last sort field), so every record has a unique key and
+pages can resume from the key of the last record served.
+"""
+
+import sys
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+from indexes import keys_after, skill_key, split_skills
+
+
+# Fields /sort_alumni can order by
+SORTABLE_FIELDS = (
+    "id", "firstname", "surname", "gender", "batch", "current_organization",
+    "current_position", "current_location", "Industry_experiences",
+)
+NUMERIC_FIELDS = ("Industry_experiences",)
+
+
+class _Desc:
+    """Inverts the ordering of a non-numeric value inside a sort key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "_Desc") -> bool:
+        return other.value < self.value
+
+    def __gt__(self, other: "_Desc") -> bool:
+        return self.value < other.value
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Desc) and self.value == other.value
+
+
+class SortSpec:
+    def __init__(self, keys: List[Tuple[str, bool]]):
+        # (field, descending) pairs; empty means ID order
+        self.keys = keys or [("id", False)]
+
+    @classmethod
+    def parse(cls, sort_by: Optional[str], order: str = "asc") -> "SortSpec":
+        """Parse "batch:desc,Industry_experiences,surname:asc"; bare fields use `order`."""
+        keys = []
+        for part in (sort_by or "").split(","):
+            if not part.strip():
+                continue
+            field, _, direction = part.strip().partition(":")
+            direction = direction or order
+            if field not in SORTABLE_FIELDS:
+                raise ValueError(f"Cannot sort by '{field}'. Sortable fields: {', '.join(SORTABLE_FIELDS)}")
+            if direction not in ("asc", "desc"):
+                raise ValueError("Order must be 'asc' or 'desc'")
+            keys.append((field, direction == "desc"))
+        return cls(keys)
+
+    @property
+    def ordering(self) -> str:
+        return ",".join(f"{f}:{'desc' if d else 'asc'}" for f, d in self.keys)
+
+    @property
+    def index_field(self) -> Optional[str]:
+        # A single-field sort can be served by that field's sorted index, if any
+        return self.keys[0][0] if len(self.keys) == 1 else None
+
+    @property
+    def descending(self) -> bool:
+        return self.keys[-1][1]
+
+    def raw_key(self, record: dict) -> tuple:
+        """Plain (JSON-safe) sort values of a record, ending with its ID."""
+        values = []
+        for field, _ in self.keys:
+            value = record.get(field)
+            if value is None:
+                value = 0 if field in NUMERIC_FIELDS else ""
+            values.append(value)
+        return (*values, record["id"])
+
+    def sort_key(self, raw: tuple) -> tuple:
+        """Turn a raw key into one that sorts ascending in the requested order."""
+        key = []
+        directions = [d for _, d in self.keys] + [self.descending]
+        fields = [f for f, _ in self.keys] + ["id"]
+        for field, desc, value in zip(fields, directions, raw):
+            if not desc:
+                key.append(value)
+            elif field in NUMERIC_FIELDS:
+                key.append(-value)
+            else:
+                key.append(_Desc(value))
+        return tuple(key)
+
+
+class Filters:
+    def __init__(
+        self,
+        batch: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None,
+        batch_from: Optional[int] = None,
+        batch_to: Optional[int] = None,
+        skills: Iterable[str] = (),
+    ):
+        # Stored values are interned (columns.Symbols), so interned filter
+        # values compare by identity
+        self.batch = sys.intern(batch) if batch else batch
+        self.gender = sys.intern(gender) if gender else gender
+        self.min_experience = min_experience
+        self.max_experience = max_experience
+        self.batch_from = batch_from
+        self.batch_to = batch_to
+        # Alumni must have all of these (matched like /skills/search)
+        self.skills = [s for s in skills if skill_key(s)]
+
+    @property
+    def key(self) -> tuple:
+        """Normalized filter values: equal keys select the same alumni (e.g. for cache keys)."""
+        return (
+            self.batch, self.gender, self.min_experience, self.max_experience, self.batch_from, self.batch_to,
+            tuple(sorted({skill_key(s) for s in self.skills})),
+        )
+
+    @property
+    def experience_range(self) -> bool:
+        return self.min_experience is not None or self.max_experience is not None
+
+    @property
+    def batch_range(self) -> bool:
+        return self.batch_from is not None or self.batch_to is not None
+
+    def batch_bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        # Batches look like "2008-10", so start years compare correctly as strings
+        low = None if self.batch_from is None else str(self.batch_from)
+        high = None if self.batch_to is None else f"{self.batch_to}-99"
+        return low, high
+
+    def matches(self, record: dict) -> bool:
+        if self.batch and record.get("batch") != self.batch:
+            return False
+        if self.gender and record.get("gender") != self.gender:
+            return False
+        if self.experience_range:
+            experience = record.get("Industry_experiences") or 0
+            if self.min_experience is not None and experience < self.min_experience:
+                return False
+            if self.max_experience is not None and experience > self.max_experience:
+                return False
+        if self.batch_range:
+            low, high = self.batch_bounds()
+            batch = record.get("batch") or ""
+            if (low is not None and batch < low) or (high is not None and batch > high):
+                return False
+        if self.skills:
+            have = {skill_key(s) for s in split_skills(record)}
+            if any(skill_key(s) not in have for s in self.skills):
+                return False
+        return True
+
+
+def plan(store, filters: Filters):
+    """Pick the most selective index for the filters.
+
+    Returns (candidate IDs or None for "everything", exact) where exact
+    means the candidates already satisfy every filter.
+    """
+    options = []  # (estimated size, number of filters covered, fetch)
+    if filters.batch and filters.gender:
+        ids = store.by_batch_gender.lookup((filters.batch, filters.gender))
+        options.append((len(ids), 2, lambda ids=ids: ids))
+    if filters.batch:
+        ids = store.by_batch.lookup(filters.batch)
+        options.append((len(ids), 1, lambda ids=ids: ids))
+    if filters.gender:
+        ids = store.by_gender.lookup(filters.gender)
+        options.append((len(ids), 1, lambda ids=ids: ids))
+    if filters.experience_range:
+        low, high = filters.min_experience, filters.max_experience
+        options.append((
+            store.by_experience.count_between(low, high),
+            1,
+            lambda low=low, high=high: set(store.by_experience.ids_between(low, high)),
+        ))
+    if filters.batch_range:
+        low, high = filters.batch_bounds()
+        options.append((
+            store.by_batch_order.count_between(low, high),
+            1,
+            lambda low=low, high=high: set(store.by_batch_order.ids_between(low, high)),
+        ))
+    if filters.skills:
+        bitmap = store.skills.match(all_of=filters.skills)
+        options.append((bitmap.bit_count(), 1, lambda bitmap=bitmap: set(store.rows.ids(bitmap))))
+    if not options:
+        return None, True
+
+    # Smallest estimate first; on a tie prefer the index covering more filters
+    size, covered, fetch = min(options, key=lambda o: (o[0], -o[1]))
+    active = sum((
+        bool(filters.batch), bool(filters.gender), filters.experience_range, filters.batch_range, bool(filters.skills),
+    ))
+    return fetch(), covered == active
+
+
+def execute(
+    store,
+    filters: Filters,
+    sort: SortSpec,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+) -> Tuple[int, List[dict], List[tuple]]:
+    """Run a query against the store (caller holds the store lock).
+
+    `after` is the raw key of the last record of the previous page.
+    Returns (total matches, records of this page, their raw keys).
+    """
+    records = store.records
+    candidates, exact = plan(store, filters)
+    if candidates is not None and not exact:
+        candidates = {i for i in candidates if filters.matches(records[i])}
+    total = len(records) if candidates is None else len(candidates)
+
+    index = store.sorted_indexes.get(sort.index_field)
+    if index is not None and (candidates is None or len(candidates) * 4 >= len(records)):
+        # Walk the field's sorted index (its keys are already raw keys)
+        keys = index.range(sort.descending, after)
+        if candidates is not None:
+            keys = (k for k in keys if k[-1] in candidates)
+        page = list(islice(keys, offset, None if limit is None else offset + limit))
+    else:
+        # Sort just the candidates
+        pool = records.values() if candidates is None else (records[i] for i in candidates)
+        keyed = sorted((sort.sort_key(sort.raw_key(r)), r["id"]) for r in pool)
+        start = None if after is None else (sort.sort_key(after), after[-1])
+        chosen = islice(keys_after(keyed, False, start), offset, None if limit is None else offset + limit)
+        page = [sort.raw_key(records[alumni_id]) for _, alumni_id in chosen]
+
+    return total, [records[k[-1]] for k in page], page
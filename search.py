@@ -0,0 +1,291 @@
+"""Full-text and fuzzy search over alumni records.
+
+TextIndex is an inverted index (token -> {alumni id: term frequency})
+ranked with BM25. TrigramIndex finds misspelled names by the character
+trigrams they share with the query. PrefixIndex serves type-ahead
+suggestions. All follow the same add/remove/rebuild protocol as the
+indexes in indexes.py, so AlumniStore keeps them current on every mutation.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Fields searched by /search
+SEARCH_FIELDS = ("firstname", "surname", "current_organization", "current_position", "current_location")
+# Fields matched by /search/fuzzy
+NAME_FIELDS = ("firstname", "surname")
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text) -> List[str]:
+    # Case-folded word tokens; stray whitespace and punctuation ("Senior Manager ",
+    # "Goregaon, Maharashtra") never ends up in a token
+    if not text:
+        return []
+    return _TOKEN.findall(str(text).casefold())
+
+
+class TextIndex:
+    # Standard BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, fields: Tuple[str, ...] = SEARCH_FIELDS):
+        self.fields = fields
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def _tokens(self, record: dict) -> List[str]:
+        tokens = []
+        for field in self.fields:
+            tokens.extend(tokenize(record.get(field)))
+        return tokens
+
+    def add(self, record: dict) -> None:
+        alumni_id = record["id"]
+        tokens = self._tokens(record)
+        for token in tokens:
+            postings = self._postings.setdefault(token, {})
+            postings[alumni_id] = postings.get(alumni_id, 0) + 1
+        self._lengths[alumni_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, record: dict) -> None:
+        alumni_id = record["id"]
+        for token in set(self._tokens(record)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(alumni_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._lengths.pop(alumni_id, 0)
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+        for record in records:
+            self.add(record)
+
+    def search(self, query: str, limit: int = 20) -> Tuple[int, List[Tuple[str, float]]]:
+        """Return (number of matching alumni, top `limit` (id, score) pairs by BM25)."""
+        count = len(self._lengths)
+        if not count:
+            return 0, []
+        avg_length = self._total_length / count or 1
+        scores: Dict[str, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for alumni_id, tf in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[alumni_id] / avg_length)
+                scores[alumni_id] = scores.get(alumni_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+        # Highest score first, ID as a stable tie-breaker
+        top = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(scores), top
+
+
+def trigrams(word: str) -> frozenset:
+    # Padded so short names and word starts/ends still produce trigrams
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """Character-trigram index over the distinct words of the name fields.
+
+    Names repeat a lot, so trigrams point at distinct words and each word
+    points at the alumni using it. Instead of running edit distance over
+    every record, a lookup only considers words found in the query's rarest
+    trigram lists (any word reaching the similarity threshold must share
+    at least ceil(threshold * |query trigrams|) of them) and then checks
+    those few candidates exactly.
+    """
+
+    def __init__(self, fields: Tuple[str, ...] = NAME_FIELDS):
+        self.fields = fields
+        self._words: Dict[str, Dict[str, int]] = {}  # word -> {alumni id: occurrences}
+        self._word_grams: Dict[str, frozenset] = {}  # word -> its trigrams
+        self._grams: Dict[str, set] = {}  # trigram -> words containing it
+
+    def _record_words(self, record: dict) -> List[str]:
+        words = []
+        for field in self.fields:
+            words.extend(tokenize(record.get(field)))
+        return words
+
+    def add(self, record: dict) -> None:
+        alumni_id = record["id"]
+        for word in self._record_words(record):
+            ids = self._words.get(word)
+            if ids is None:
+                ids = self._words[word] = {}
+                self._word_grams[word] = grams = trigrams(word)
+                for gram in grams:
+                    self._grams.setdefault(gram, set()).add(word)
+            ids[alumni_id] = ids.get(alumni_id, 0) + 1
+
+    def remove(self, record: dict) -> None:
+        alumni_id = record["id"]
+        for word in self._record_words(record):
+            ids = self._words.get(word)
+            if ids is None or alumni_id not in ids:
+                continue
+            ids[alumni_id] -= 1
+            if not ids[alumni_id]:
+                del ids[alumni_id]
+            if not ids:
+                del self._words[word]
+                for gram in self._word_grams.pop(word):
+                    words = self._grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._grams[gram]
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._words = {}
+        self._word_grams = {}
+        self._grams = {}
+        for record in records:
+            self.add(record)
+
+    def _similar_words(self, term: str, min_similarity: float) -> Dict[str, float]:
+        query = trigrams(term)
+        # Prefix filter: a match shares >= ceil(t * |query|) trigrams, so it must
+        # appear in one of the (|query| - that + 1) shortest posting lists
+        needed = max(1, math.ceil(min_similarity * len(query) - 1e-9))
+        postings = sorted((self._grams.get(gram, ()) for gram in query), key=len)
+        candidates = set().union(*postings[:len(query) - needed + 1])
+
+        similar = {}
+        for word in candidates:
+            grams = self._word_grams[word]
+            # Length filter, then exact Jaccard similarity of the trigram sets
+            if len(grams) * min_similarity > len(query) or len(query) * min_similarity > len(grams):
+                continue
+            common = len(query & grams)
+            score = common / (len(query) + len(grams) - common)
+            if score >= min_similarity:
+                similar[word] = score
+        return similar
+
+    def search(self, name: str, limit: int = 10, min_similarity: float = 0.3) -> List[Tuple[str, float]]:
+        """Top `limit` (alumni id, score) pairs; score averages each query word's best match."""
+        terms = tokenize(name)
+        if not terms:
+            return []
+        totals: Dict[str, float] = {}
+        for term in terms:
+            best: Dict[str, float] = {}
+            for word, score in self._similar_words(term, min_similarity).items():
+                for alumni_id in self._words[word]:
+                    if score > best.get(alumni_id, 0.0):
+                        best[alumni_id] = score
+            for alumni_id, score in best.items():
+                totals[alumni_id] = totals.get(alumni_id, 0.0) + score
+        scored = ((alumni_id, total / len(terms)) for alumni_id, total in totals.items())
+        return heapq.nsmallest(limit, scored, key=lambda item: (-item[1], item[0]))
+
+
+class PrefixIndex:
+    """Distinct values of some fields, kept sorted for prefix lookups by bisect.
+
+    Values are grouped by `key` (case-folded by default) with surrounding
+    whitespace ignored; each suggestion comes back in its most common
+    spelling along with how many alumni use it. `values` picks the values
+    out of a record (by default, the non-empty fields). One- and two-letter
+    prefixes match large ranges, so their results are memoised until the
+    next write.
+    """
+
+    CACHED_PREFIX_LENGTH = 2
+
+    def __init__(
+        self,
+        fields: Tuple[str, ...],
+        values: Optional[Callable[[dict], List[str]]] = None,
+        key: Callable[[str], str] = str.casefold,
+    ):
+        self.fields = fields
+        self.values = values or self._field_values
+        self.key = key
+        self._keys: List[str] = []  # sorted keys
+        self._spellings: Dict[str, Dict[str, int]] = {}  # key -> {spelling: count}
+        self._cache: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+
+    def _field_values(self, record: dict) -> List[str]:
+        values = []
+        for field in self.fields:
+            value = record.get(field)
+            if isinstance(value, str) and value.strip():
+                values.append(value.strip())
+        return values
+
+    def _keyed(self, record: dict) -> Dict[str, str]:
+        # key -> spelling, once per alumni however many of its fields share the value
+        keyed = {}
+        for value in self.values(record):
+            key = self.key(value)
+            if key:
+                keyed.setdefault(key, value)
+        return keyed
+
+    def add(self, record: dict) -> None:
+        self._cache.clear()
+        for key, value in self._keyed(record).items():
+            spellings = self._spellings.get(key)
+            if spellings is None:
+                spellings = self._spellings[key] = {}
+                insort(self._keys, key)
+            spellings[value] = spellings.get(value, 0) + 1
+
+    def remove(self, record: dict) -> None:
+        self._cache.clear()
+        for key, value in self._keyed(record).items():
+            spellings = self._spellings.get(key)
+            if spellings is None or value not in spellings:
+                continue
+            spellings[value] -= 1
+            if not spellings[value]:
+                del spellings[value]
+            if not spellings:
+                del self._spellings[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        self._keys = []
+        self._spellings = {}
+        self._cache = {}
+        for record in records:
+            for key, value in self._keyed(record).items():
+                spellings = self._spellings.setdefault(key, {})
+                spellings[value] = spellings.get(value, 0) + 1
+        self._keys = sorted(self._spellings)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most frequent values starting with `prefix`, as (value, count) pairs."""
+        prefix = self.key(prefix.strip())
+        cacheable = len(prefix) <= self.CACHED_PREFIX_LENGTH
+        if cacheable and (prefix, limit) in self._cache:
+            return self._cache[prefix, limit]
+
+        start = bisect_left(self._keys, prefix)
+        matches = []
+        for i in range(start, len(self._keys)):
+            key = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            spellings = self._spellings[key]
+            matches.append((max(spellings, key=spellings.get), sum(spellings.values())))
+        top = heapq.nsmallest(limit, matches, key=lambda item: (-item[1], item[0].casefold()))
+        if cacheable:
+            self._cache[prefix, limit] = top
+        return top
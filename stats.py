@@ -0,0 +1,161 @@
+"""Columnar NumPy mirror of the alumni records for aggregate statistics.
+
+Each alumni row number (see indexes.RowIds) is a position in a few flat
+arrays: Industry_experiences as float64 (NaN when missing) and batch,
+gender, organization and location as integer category codes. AlumniStore
+updates the row on every mutation, and /stats runs grouped aggregates
+(bincount, lexsort + split) over these arrays instead of looping over
+record dicts. The code columns also count the organization and location
+facets of /facets, which have too many distinct values for a bitmap each.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from columns import Categories
+from indexes import RowIds
+
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _clean(value) -> Optional[str]:
+    # Blank and whitespace-only values count as unknown
+    return (value.strip() or None) if isinstance(value, str) else value
+
+
+class ColumnMirror:
+    CATEGORICAL = {
+        "batch": "batch",
+        "gender": "gender",
+        "organization": "current_organization",
+        "location": "current_location",
+    }
+
+    def __init__(self, rows: RowIds, capacity: int = 1024):
+        self.rows = rows
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.experience = np.full(capacity, np.nan)
+        self.categories = {name: Categories() for name in self.CATEGORICAL}
+        self.codes = {name: np.zeros(capacity, dtype=np.int32) for name in self.CATEGORICAL}
+
+    def _ensure(self, row: int) -> None:
+        size = len(self.alive)
+        if row < size:
+            return
+        new_size = max(size * 2, row + 1)
+        self.alive = np.concatenate([self.alive, np.zeros(new_size - size, dtype=bool)])
+        self.experience = np.concatenate([self.experience, np.full(new_size - size, np.nan)])
+        for name, column in self.codes.items():
+            self.codes[name] = np.concatenate([column, np.zeros(new_size - size, dtype=np.int32)])
+
+    def add(self, record: dict) -> None:
+        row = self.rows.row(record["id"])
+        self._ensure(row)
+        experience = record.get("Industry_experiences")
+        self.experience[row] = np.nan if experience is None else experience
+        for name, field in self.CATEGORICAL.items():
+            self.codes[name][row] = self.categories[name].code(_clean(record.get(field)))
+        self.alive[row] = True
+
+    def remove(self, record: dict) -> None:
+        self.alive[self.rows.row(record["id"])] = False
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        records = list(records)
+        self._allocate(max(1024, len(records)))
+        for record in records:
+            self.add(record)
+
+    # ---------- facets ----------
+
+    def rows_with(self, name: str, value: str) -> np.ndarray:
+        """Boolean array of the live rows whose `name` column is `value`."""
+        value = _clean(value)
+        code = None if value is None else self.categories[name].codes.get(value)
+        if code is None:
+            return np.zeros(len(self.alive), dtype=bool)
+        return self.alive & (self.codes[name] == code)
+
+    def value_counts(self, name: str, rows: np.ndarray, limit: int) -> List[Tuple[str, int]]:
+        """(value, count) of the known values of column `name` among `rows`.
+
+        Only values that can make the `limit` most common are returned
+        (every value tied with the last of them included).
+        """
+        labels = self.categories[name].values
+        counts = np.bincount(self.codes[name][rows], minlength=len(labels))
+        unknown = self.categories[name].codes.get(None)
+        if unknown is not None:
+            counts[unknown] = 0
+        present = np.flatnonzero(counts)
+        if len(present) > limit:
+            threshold = np.partition(counts[present], -limit)[-limit]
+            present = present[counts[present] >= threshold]
+        return [(labels[c], int(counts[c])) for c in present.tolist()]
+
+    # ---------- aggregates ----------
+
+    @staticmethod
+    def _describe(values: np.ndarray) -> dict:
+        known = values[~np.isnan(values)]
+        summary = {"headcount": int(len(values)), "with_experience": int(len(known))}
+        if len(known):
+            summary["mean"] = round(float(known.mean()), 2)
+            points = np.percentile(known, PERCENTILES)
+            summary.update({f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, points)})
+            summary["median"] = summary["p50"]
+        return summary
+
+    def _group_by(self, name: str, live: np.ndarray) -> Dict[str, dict]:
+        codes = self.codes[name][live]
+        experience = self.experience[live]
+        if not len(codes):
+            return {}
+        # Order rows by (code, experience) once, then cut the array at code boundaries
+        order = np.lexsort((experience, codes))
+        codes, experience = codes[order], experience[order]
+        present = np.unique(codes)
+        bounds = np.searchsorted(codes, present, side="left").tolist() + [len(codes)]
+        labels = self.categories[name].values
+        groups = {}
+        for i, code in enumerate(present):
+            label = labels[code]
+            groups["Unknown" if label is None else str(label)] = self._describe(experience[bounds[i]:bounds[i + 1]])
+        return dict(sorted(groups.items()))
+
+    def _concentration(self, live: np.ndarray, top: int) -> dict:
+        codes = self.codes["organization"][live]
+        unknown = self.categories["organization"].codes.get(None)
+        if unknown is not None:
+            codes = codes[codes != unknown]
+        counts = np.bincount(codes, minlength=len(self.categories["organization"].values))
+        total = int(counts.sum())
+        if not total:
+            return {"organizations": 0, "hhi": None, "top": []}
+        shares = counts / total
+        labels = self.categories["organization"].values
+        leaders = np.argsort(-counts, kind="stable")[:top]
+        return {
+            "organizations": int(np.count_nonzero(counts)),
+            # Herfindahl-Hirschman index: 1/organizations (spread out) .. 1 (everyone at one employer)
+            "hhi": round(float(np.square(shares).sum()), 4),
+            "top": [
+                {"organization": labels[c], "headcount": int(counts[c]), "share": round(float(shares[c]), 4)}
+                for c in leaders
+                if counts[c]
+            ],
+        }
+
+    def summary(self, top_organizations: int = 10) -> dict:
+        live = self.alive.copy()
+        return {
+            "overall": self._describe(self.experience[live]),
+            "by_batch": self._group_by("batch", live),
+            "by_gender": self._group_by("gender", live),
+            "organization_concentration": self._concentration(live, top_organizations),
+        }
@@ -0,0 +1,402 @@
+"""In-memory alumni store.
+
+The whole directory is loaded once at startup and every read is served from
+memory. Disk is only touched when a record is created, changed or removed,
+through one of the persistence backends in backends.py.
+
+Writes go through a GroupCommitter: mutations arriving within a short
+window are handed to the backend as one group (one write + fsync), and
+each request awaits the flush that contains its change. A change is only
+applied in memory once the backend has it, so readers never see (and a
+checkpoint never saves) a change that failed to reach disk. The store
+lock isn't held while the group is written, so reads carry on meanwhile.
+
+Records live in a columnar AlumniTable (columns.py). Secondary indexes
+(indexes.py) and the full-text index (search.py) are maintained alongside
+them so filtered reads and searches cost O(matching records) rather than
+O(all alumni). Reads hand out plain dicts, materialized (and trimmed to
+the requested fields) while the lock is held.
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backends import StorageBackend, apply_op
+from columns import AlumniTable
+from indexes import (
+    SKILL_FIELDS, BitmapIndex, FieldIndex, SkillIndex, SortedIndex, bitmap_rows, facet_keys, rows_bitmap, skill_key,
+    split_skills,
+)
+from query import Filters, SortSpec, execute
+from search import NAME_FIELDS, PrefixIndex, TextIndex, TrigramIndex
+from stats import ColumnMirror
+
+
+# Facet name -> record field, for the /facets with a bitmap per value (few values)
+FACET_FIELDS = {
+    "batch": "batch",
+    "gender": "gender",
+}
+# Facets with many distinct values, counted on the ColumnMirror code columns
+COLUMN_FACETS = ("organization", "location")
+
+# Field names to return (None = the whole record), as built by app.projection_plan
+Fields = Optional[Tuple[str, ...]]
+
+log = logging.getLogger(__name__)
+
+# How long the committer waits to collect more mutations before flushing
+COMMIT_WINDOW_MS = float(os.environ.get("ALUMNI_COMMIT_WINDOW_MS", "10"))
+
+
+class GroupCommitter:
+    """Coalesces backend writes that arrive within `window` seconds into one flush."""
+
+    def __init__(self, write: Callable[[List[dict]], None], window: float):
+        self._write = write
+        self.window = window
+        self._pending: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, op: dict) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        await future
+
+    async def drain(self) -> None:
+        if self._task is not None:
+            await self._task
+
+    async def _run(self) -> None:
+        try:
+            await asyncio.sleep(self.window)
+            # Anything submitted while a flush is in progress goes into the next one
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    await asyncio.to_thread(self._write, [op for op, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result(None)
+        finally:
+            self._task = None
+
+
+class AlumniStore:
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.committer = GroupCommitter(self._flush, COMMIT_WINDOW_MS / 1000)
+        self.records = AlumniTable()
+        # Shared with Alumni._batch_counts so generated IDs stay consistent. It moves
+        # as soon as an ID is handed out, even if that write then fails, so what
+        # the store serves and saves is `applied_counts`: the counters carried by
+        # the last applied mutation
+        self.batch_counts: Dict[str, int] = {}
+        self.applied_counts: Dict[str, int] = {}
+        # Sequence number of the last applied mutation, and of the last one handed out
+        self.seq = 0
+        self._issued = 0
+        # (seq, unix time) of the load, of the last change to the directory and
+        # of the last change to each record changed since load
+        self.loaded: Tuple[int, float] = (0, time.time())
+        self.modified = self.loaded
+        self.versions: Dict[str, Tuple[int, float]] = {}
+        # Called with the IDs each mutation touched (e.g. to drop cached responses)
+        self.listeners: List[Callable[[List[str]], None]] = []
+        self.by_batch = FieldIndex("batch")
+        self.by_gender = FieldIndex("gender")
+        self.by_batch_gender = FieldIndex("batch", "gender")
+        self.by_experience = SortedIndex("Industry_experiences")
+        self.by_batch_order = SortedIndex("batch", default="")
+        self.by_id = SortedIndex("id")
+        # Sort fields that can be read straight off an index
+        self.sorted_indexes = {
+            "Industry_experiences": self.by_experience,
+            "batch": self.by_batch_order,
+            "id": self.by_id,
+        }
+        self.text = TextIndex()
+        self.names = TrigramIndex()
+        # Type-ahead sources for /autocomplete
+        self.completions = {
+            "name": PrefixIndex(NAME_FIELDS),
+            "organization": PrefixIndex(("current_organization",)),
+            # One suggestion per skill, grouped like /skills/search and /facets match them
+            "skill": PrefixIndex(SKILL_FIELDS, values=split_skills, key=skill_key),
+        }
+        # Row numbers of the table, shared by the bitmap indexes
+        self.rows = self.records.rows
+        self.skills = SkillIndex(self.rows)
+        # Bitmaps behind /facets (skills come from self.skills)
+        self.facets = {
+            name: BitmapIndex(self.rows, facet_keys(field))
+            for name, field in FACET_FIELDS.items()
+        }
+        # NumPy columns behind /stats
+        self.columns = ColumnMirror(self.rows)
+        self._indexes = [
+            self.by_batch, self.by_gender, self.by_batch_gender, *self.sorted_indexes.values(),
+            self.text, self.names, *self.completions.values(), self.skills, *self.facets.values(),
+            self.columns,
+        ]
+        self._lock = threading.RLock()
+        # Serialises backend writes and checkpoints (held without the store lock)
+        self._backend_lock = threading.Lock()
+
+    # ---------- loading / saving ----------
+
+    def load(self) -> None:
+        state = self.backend.load()
+        with self._lock:
+            self.records.load(state["alumni"])
+            self.batch_counts.clear()
+            self.batch_counts.update(state["batch_counts"])
+            self.applied_counts = dict(state["batch_counts"])
+            self.seq = self._issued = state["seq"]
+            self.loaded = self.modified = (self.seq, time.time())
+            self.versions = {}
+            for index in self._indexes:
+                index.rebuild(self.records.values())
+
+    def _state(self) -> dict:
+        data = self.as_dict()
+        data["seq"] = self.seq
+        return data
+
+    async def close(self) -> None:
+        await self.committer.drain()
+        with self._backend_lock:
+            with self._lock:
+                state = self._state()
+            self.backend.close(state)
+
+    # ---------- reads ----------
+
+    def __contains__(self, alumni_id: str) -> bool:
+        return alumni_id in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def version(self, alumni_id: Optional[str] = None) -> Optional[Tuple[int, float]]:
+        """(sequence number, time) of the last change to one record, or to the whole directory.
+
+        A record's content at a given sequence number never changes, so the
+        number makes a strong validator (ETag). None if the record doesn't exist.
+        """
+        with self._lock:
+            if alumni_id is None:
+                return self.modified
+            if alumni_id not in self.records:
+                return None
+            return self.versions.get(alumni_id, self.loaded)
+
+    def get(self, alumni_id: str, fields: Fields = None) -> Optional[dict]:
+        with self._lock:
+            record = self.records.get(alumni_id)
+            return None if record is None else record.to_dict(fields)
+
+    def query(
+        self,
+        filters: Filters,
+        sort: SortSpec,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        after: Optional[Tuple] = None,
+        fields: Fields = None,
+    ) -> Tuple[int, List[dict], List[Tuple]]:
+        """One page of matching records plus the total match count (see query.py).
+
+        `after` is the sort key of the last record of the previous page
+        (keyset pagination), so pages stay stable while records are inserted.
+        Returns (total, records, keys).
+        """
+        with self._lock:
+            total, rows, keys = execute(self, filters, sort, offset, limit, after)
+            return total, [r.to_dict(fields) for r in rows], keys
+
+    def search(self, text: str, limit: int = 20, fields: Fields = None) -> Tuple[int, List[Tuple[dict, float]]]:
+        """Full-text search ranked by BM25; returns (total matches, [(record, score)])."""
+        with self._lock:
+            total, top = self.text.search(text, limit)
+            return total, [(self.records[i].to_dict(fields), score) for i, score in top]
+
+    def fuzzy_names(
+        self, name: str, limit: int = 10, min_similarity: float = 0.3, fields: Fields = None
+    ) -> List[Tuple[dict, float]]:
+        """Alumni whose first/surname resemble `name` (trigram similarity), best first."""
+        with self._lock:
+            hits = self.names.search(name, limit, min_similarity)
+            return [(self.records[i].to_dict(fields), score) for i, score in hits]
+
+    def complete(self, kind: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Suggestions of one kind (name/organization/skill) starting with `prefix`."""
+        with self._lock:
+            return self.completions[kind].complete(prefix, limit)
+
+    def skill_query(
+        self,
+        all_of: List[str],
+        any_of: List[str],
+        none_of: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Fields = None,
+    ) -> Tuple[int, List[dict]]:
+        """Alumni matching a boolean skill query, in ID order; returns (total, page)."""
+        with self._lock:
+            bitmap = self.skills.match(all_of, any_of, none_of)
+            ids = sorted(self.rows.ids(bitmap))
+            page = ids[offset:] if limit is None else ids[offset:offset + limit]
+            return bitmap.bit_count(), [self.records[i].to_dict(fields) for i in page]
+
+    def facet_counts(
+        self,
+        selected: Dict[str, str],
+        skills: List[str],
+        facets: List[str],
+        limit: int = 20,
+    ) -> Tuple[int, Dict[str, List[Tuple[str, int]]]]:
+        """Per-value counts of each facet among alumni matching the selection.
+
+        `selected` maps facet name -> value and `skills` must all be present.
+        Everything is bitmap ANDs and popcounts, plus a bincount of the
+        matching rows' codes for organization and location; no record is
+        visited.
+        Returns (matching alumni, {facet: [(value, count), ...] most common first}).
+        """
+        with self._lock:
+            mask = self.skills.match(all_of=skills)
+            for name, value in selected.items():
+                if name in COLUMN_FACETS:
+                    mask &= rows_bitmap(self.columns.rows_with(name, value))
+                else:
+                    mask &= self.facets[name].bitmap(value.strip())
+
+            counts = {}
+            rows = None
+            for name in facets:
+                if name == "skill":
+                    pairs = ((self.skills.display(k), (b & mask).bit_count()) for k, b in self.skills.items())
+                elif name in COLUMN_FACETS:
+                    if rows is None:
+                        rows = bitmap_rows(mask)
+                    pairs = self.columns.value_counts(name, rows, limit)
+                else:
+                    pairs = ((v, (b & mask).bit_count()) for v, b in self.facets[name].items())
+                counts[name] = heapq.nsmallest(
+                    limit, (p for p in pairs if p[1]), key=lambda p: (-p[1], str(p[0]))
+                )
+            return mask.bit_count(), counts
+
+    def stats(self, top_organizations: int = 10) -> dict:
+        """Experience and headcount aggregates, computed on the NumPy columns."""
+        with self._lock:
+            return self.columns.summary(top_organizations)
+
+    def iter_records(self, fields: Fields = None, chunk_size: int = 1000) -> Iterator[List[Tuple[str, dict]]]:
+        """(id, record) of every alumni, in row order, materialized `chunk_size` at a time.
+
+        The lock is only held while a chunk is built, so writers aren't
+        blocked for the length of a download. Records deleted meanwhile are
+        skipped; each record is served as it was when its chunk was built.
+        """
+        with self._lock:
+            ids = list(self.records)
+        for start in range(0, len(ids), chunk_size):
+            with self._lock:
+                rows = ((i, self.records.get(i)) for i in ids[start:start + chunk_size])
+                chunk = [(i, r.to_dict(fields)) for i, r in rows if r is not None]
+            yield chunk
+
+    def counters(self) -> Tuple[int, Dict[str, int]]:
+        """(sequence number, batch counters) as of the last applied mutation."""
+        with self._lock:
+            return self.seq, dict(self.applied_counts)
+
+    def as_dict(self, fields: Fields = None) -> dict:
+        with self._lock:
+            return {"alumni": self.records.to_dicts(fields), "batch_counts": dict(self.applied_counts)}
+
+    # ---------- mutations ----------
+
+    # Each change is written to the backend first and applied in memory once
+    # that succeeded; the coroutine returns when the change is both durable
+    # and visible, and raises (leaving the store untouched) if the write failed.
+
+    async def put(self, record: dict) -> None:
+        await self._commit({"op": "put", "record": record})
+
+    async def delete(self, alumni_id: str) -> Optional[dict]:
+        record = self.get(alumni_id)
+        if record is not None:
+            await self._commit({"op": "delete", "id": alumni_id})
+        return record
+
+    async def rename(self, old_id: str, record: dict) -> None:
+        await self._commit({"op": "rename", "old_id": old_id, "record": record})
+
+    async def _commit(self, op: dict) -> None:
+        with self._lock:
+            if "record" in op:
+                # Journal and indexes see the record exactly as the table stores it
+                op["record"] = self.records.normalize(op["record"])
+            self._issued += 1
+            op["seq"] = self._issued
+            # Counters are tiny, so each entry carries them whole
+            op["batch_counts"] = dict(self.batch_counts)
+        await self.committer.submit(op)
+
+    def _flush(self, ops: List[dict]) -> None:
+        # Runs in a worker thread, one group at a time. Reads only wait for
+        # the in-memory apply, not for the write and its fsync.
+        with self._backend_lock:
+            self.backend.write(ops)
+            with self._lock:
+                for op in ops:
+                    self._apply(op)
+                state = self._state() if self.backend.needs_checkpoint else None
+            if state is not None:
+                try:
+                    self.backend.checkpoint(state)
+                except OSError:
+                    # The ops themselves are durable; compaction is retried after the next group
+                    log.exception("Checkpoint failed")
+
+    def _apply(self, op: dict) -> None:
+        # Unindex every record this op replaces or removes
+        replaced = [op["id"]] if op["op"] == "delete" else [op["record"]["id"]]
+        if op["op"] == "rename":
+            replaced.append(op["old_id"])
+        for alumni_id in replaced:
+            old = self.records.get(alumni_id)
+            if old is not None:
+                for index in self._indexes:
+                    index.remove(old)
+        apply_op(self.records, op)
+        if "record" in op:
+            for index in self._indexes:
+                index.add(op["record"])
+        # Ops are applied in the order their counters were copied, so these only grow
+        self.applied_counts.update(op.get("batch_counts", {}))
+        self.seq = op["seq"]
+
+        self.modified = (op["seq"], time.time())
+        for alumni_id in replaced:
+            self.versions.pop(alumni_id, None)
+        if "record" in op:
+            self.versions[op["record"]["id"]] = self.modified
+        for listener in self.listeners:
+            listener(replaced)
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from backends import StorageBackend, apply_op
+from benchmarks.synthetic import generate
+from store import AlumniStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MemoryBackend(StorageBackend):
+    """Backend keeping the persisted state in a dict, for store tests."""
+
+    def __init__(self, records=None):
+        self.state = {"alumni": dict(records or {}), "batch_counts": {}, "seq": 0}
+        self.fail = False
+
+    def load(self) -> dict:
+        return {**self.state, "alumni": dict(self.state["alumni"])}
+
+    def write(self, ops) -> None:
+        if self.fail:
+            raise OSError("disk full")
+        for op in ops:
+            apply_op(self.state["alumni"], op)
+            self.state["seq"] = op["seq"]
+
+
+@pytest.fixture(scope="session")
+def records():
+    return generate(300, seed=1, source=os.path.join(ROOT, "alumni_data.json"))
+
+
+@pytest.fixture(scope="session")
+def make_store():
+    def make(records) -> AlumniStore:
+        store = AlumniStore(MemoryBackend(records))
+        store.load()
+        return store
+    return make
+
+
+@pytest.fixture
+def store(records, make_store):
+    return make_store(records)
@@ -0,0 +1,166 @@
+import io
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from archive import PhotoArchive
+from codec import codec
+from conftest import ROOT
+from query import Filters, SortSpec
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The app serving a copy of alumni_data.json, with a small fake photo per alumni, from tmp_path."""
+    shutil.copy(os.path.join(ROOT, app.DATA_FILE), tmp_path / app.DATA_FILE)
+    with open(tmp_path / app.DATA_FILE, "rb") as f:
+        alumni = codec.loads(f.read())["alumni"]
+    (tmp_path / app.PHOTO_DIR).mkdir()
+    for record in alumni.values():
+        if record.get("profile_photo"):
+            (tmp_path / app.PHOTO_DIR / record["profile_photo"]).write_bytes(record["id"].encode() * 50)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, "photo_archive", PhotoArchive(app.PHOTO_DIR, app.PHOTO_ARCHIVE_FILE))
+    with TestClient(app.app) as client:
+        yield client
+
+
+def new_alumni(**fields) -> dict:
+    return {
+        "id": "", "firstname": "Asha", "gender": "Female", "batch": "2010-12",
+        "linkedin_url": "https://www.linkedin.com/in/asha", **fields,
+    }
+
+
+def test_unchanged_resources_get_a_304(client):
+    urls = ("/view", "/view/page?limit=5", "/sort_alumni?batch=2024-26&sort=surname", "/alumni/001-2009-11")
+    etags = {}
+    for url in urls:
+        first = client.get(url)
+        assert first.status_code == 200, url
+        etags[url] = first.headers["etag"]
+        again = client.get(url, headers={"If-None-Match": etags[url]})
+        assert again.status_code == 304 and not again.content, url
+        assert again.headers["etag"] == etags[url]
+
+    # A new alumni changes every directory view, but not another alumni's record
+    assert client.post("/create_alumni", json=new_alumni()).status_code == 200
+    for url in urls:
+        expected = 304 if url.startswith("/alumni/") else 200
+        assert client.get(url, headers={"If-None-Match": etags[url]}).status_code == expected, url
+
+
+def test_failed_create_leaves_batch_counts_as_served(client, monkeypatch):
+    before = client.get("/view")
+    counts = before.json()["batch_counts"]
+
+    def fail(ops):
+        raise OSError("disk full")
+    monkeypatch.setattr(app.store.backend, "write", fail)
+    assert client.post("/create_alumni", json=new_alumni()).status_code == 500
+
+    # Same version, so same ETag: the body built now must be the one clients hold
+    app.responses.clear()
+    after = client.get("/view")
+    assert after.headers["etag"] == before.headers["etag"]
+    assert after.json()["batch_counts"] == counts
+
+
+def test_gzipped_and_identity_bodies_have_their_own_etags(client):
+    gzip, identity = {"Accept-Encoding": "gzip"}, {"Accept-Encoding": "identity"}
+    # The first /view is streamed as is; gzipped bodies come from the response cache
+    client.get("/view")
+    zipped = client.get("/view", headers=gzip)
+    plain = client.get("/view", headers=identity)
+    assert zipped.headers["content-encoding"] == "gzip" and "content-encoding" not in plain.headers
+    assert zipped.json() == plain.json()
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    for headers, etag in ((gzip, zipped.headers["etag"]), (identity, plain.headers["etag"])):
+        again = client.get("/view", headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304 and again.headers["etag"] == etag
+
+
+def test_cached_responses_follow_updates(client):
+    urls = ("/view", "/view", "/alumni/001-2009-11", "/alumni/001-2024-26", "/sort_alumni?batch=2009-11")
+    for url in urls:
+        client.get(url)
+    assert len(app.responses._entries) == 4
+    record = client.get("/alumni/001-2009-11").json()
+    changed = client.put("/update_alumni/001-2009-11", json={**record, "firstname": "zelda"})
+    assert changed.status_code == 200
+    # Everything covering the updated alumni is dropped right away
+    assert [key[:2] for key in app.responses._entries] == [("/alumni", "001-2024-26")]
+
+    assert client.get("/view").json()["alumni"]["001-2009-11"]["firstname"] == "Zelda"
+    assert client.get("/alumni/001-2009-11").json()["firstname"] == "Zelda"
+    found = client.get("/sort_alumni?batch=2009-11").json()
+    assert "Zelda" in [r["firstname"] for r in found["results"]]
+
+
+@pytest.mark.parametrize("fields", [None, "id,batch"])
+def test_streamed_view_is_valid_json_and_ndjson(client, monkeypatch, fields):
+    # Small chunks, so the body is spliced together from several of them
+    monkeypatch.setattr(app, "STREAM_CHUNK", 7)
+    params = {"fields": fields} if fields else {}
+    expected = app.store.as_dict(app.projection_plan(fields))["alumni"]
+
+    document = client.get("/view", params=params, headers={"Accept-Encoding": "identity"})
+    assert document.headers["content-type"] == "application/json"
+    body = codec.loads(document.content)
+    assert body["alumni"] == expected and body["batch_counts"] == app.store.counters()[1]
+
+    lines = client.get("/view", params={**params, "format": "ndjson"}).content.split(b"\n")
+    assert lines[-1] == b""
+    assert [codec.loads(line) for line in lines[:-1]] == list(expected.values())
+
+
+def test_downloaded_json_can_be_restored(client):
+    created = client.post("/create_alumni", json=new_alumni()).json()["id"]
+    body = codec.loads(client.get("/download/json").content)
+    seq, batch_counts = app.store.counters()
+    assert body == {"alumni": app.store.as_dict()["alumni"], "batch_counts": batch_counts, "seq": seq}
+    assert created in body["alumni"] and seq > 0
+
+
+def photo_zip(response) -> dict:
+    assert response.status_code == 200 and response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.testzip() is None
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_photo_zip_holds_every_photo(client):
+    photos = {p.name: p.read_bytes() for p in Path(app.PHOTO_DIR).iterdir()}
+    assert photos and photo_zip(client.get("/download/photos")) == photos
+
+
+def test_photo_zip_follows_uploads(client):
+    photo_zip(client.get("/download/photos"))
+    # An overwrite in place (the directory doesn't change) and a new photo
+    for alumni_id in ("001-2009-11", client.post("/create_alumni", json=new_alumni()).json()["id"]):
+        uploaded = client.post(f"/upload_photo/{alumni_id}", files={"profile_photo": ("x.jpg", b"new " + alumni_id.encode())})
+        assert uploaded.status_code == 200
+        photos = photo_zip(client.get("/download/photos"))
+        assert photos[f"{alumni_id}.jpg"] == b"new " + alumni_id.encode()
+    assert photos == {p.name: p.read_bytes() for p in Path(app.PHOTO_DIR).iterdir()}
+
+
+@pytest.mark.parametrize("params, filters", [
+    ({"batch": "2024-26"}, Filters(batch="2024-26")),
+    ({"gender": "Female", "min_experience": 2}, Filters(gender="Female", min_experience=2)),
+    ({"skill": ["Python", "sql"]}, Filters(skills=["Python", "sql"])),
+    ({"batch": "2099-01"}, Filters(batch="2099-01")),
+])
+def test_filtered_photo_zip_holds_only_matching_photos(client, params, filters):
+    _, matching, _ = app.store.query(filters, SortSpec.parse(None))
+    assert len(matching) < len(app.store)
+    expected = {r["profile_photo"] for r in matching if r["profile_photo"]}
+    photos = photo_zip(client.get("/download/photos", params=params))
+    assert set(photos) == expected
+    assert photos == {name: (Path(app.PHOTO_DIR) / name).read_bytes() for name in expected}
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import pytest
+
+import archive
+from archive import PhotoArchive, stream_zip
+
+
+def test_streamed_zip_is_valid(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "BLOCK_SIZE", 100)
+    photos = {f"{i:03d}.jpg": bytes(range(256)) * i for i in range(5)}
+    for name, data in photos.items():
+        (tmp_path / name).write_bytes(data)
+    files = [(name, str(tmp_path / name)) for name in photos] + [("gone.jpg", str(tmp_path / "gone.jpg"))]
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(files)))) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == list(photos)
+        assert {name: zf.read(name) for name in zf.namelist()} == photos
+        assert {i.compress_type for i in zf.infolist()} == {zipfile.ZIP_STORED}
+
+
+def test_failed_refresh_is_retried(tmp_path, monkeypatch):
+    photo_dir = tmp_path / "photo"
+    photo_dir.mkdir()
+    (photo_dir / "a.jpg").write_bytes(b"a")
+    photos = PhotoArchive(str(photo_dir), str(tmp_path / "all_photos.zip"))
+    with photos.open() as f:
+        assert zipfile.ZipFile(f).namelist() == ["a.jpg"]
+
+    # Overwritten in place: only invalidate() tells the archive
+    (photo_dir / "a.jpg").write_bytes(b"changed")
+    photos.invalidate()
+    refresh = photos._refresh
+
+    def fail():
+        raise OSError("disk full")
+    monkeypatch.setattr(photos, "_refresh", fail)
+    with pytest.raises(OSError):
+        photos.open()
+
+    monkeypatch.setattr(photos, "_refresh", refresh)
+    with photos.open() as f:
+        assert zipfile.ZipFile(f).read("a.jpg") == b"changed"
@@ -0,0 +1,49 @@
+import math
+
+from columns import FIELDS, AlumniTable
+
+
+def test_table_behaves_like_the_dict_it_replaces(records):
+    table = AlumniTable()
+    table.load(records)
+    assert len(table) == len(records) and list(table) == list(records)
+    assert table.to_dicts() == {alumni_id: table.normalize(r) for alumni_id, r in records.items()}
+
+    alumni_id, record = next(iter(records.items()))
+    record = table.normalize(record)
+    row = table[alumni_id]
+    assert list(row) == list(FIELDS)
+    assert dict(row) == row.to_dict() == record
+    assert row.get("no_such_field", "x") == "x"
+    assert row.to_dict(("id", "batch")) == {"id": alumni_id, "batch": record["batch"]}
+
+    popped = table.pop(alumni_id)
+    assert popped == record
+    assert alumni_id not in table and table.get(alumni_id) is None and table.pop(alumni_id) is None
+    assert len(table) == len(records) - 1
+
+    # The freed row is reused, and holds nothing of the record popped from it
+    table["new-id"] = {"id": "new-id", "firstname": "Ada", "Industry_experiences": None}
+    assert table.rows.row("new-id") == row._row
+    new = table["new-id"].to_dict()
+    assert new["firstname"] == "Ada" and new["surname"] is None and new["profile_photo"] is None
+
+
+def test_missing_experience_reads_back_as_none():
+    table = AlumniTable()
+    table["a"] = {"id": "a", "Industry_experiences": math.nan}
+    table["b"] = {"id": "b", "Industry_experiences": None}
+    table["c"] = {"id": "c", "Industry_experiences": 3}
+    assert [table[i]["Industry_experiences"] for i in "abc"] == [None, None, 3.0]
+
+
+def test_values_are_trimmed_and_keep_their_case():
+    table = AlumniTable()
+    table["a"] = {"id": "a", "firstname": "  McDonald ", "current_organization": "IBM India\n", "linkedin_url": " x "}
+    table["b"] = {"id": "b", "firstname": "mcdonald", "current_organization": "IBM India"}
+    a, b = table["a"], table["b"]
+    assert (a["firstname"], a["current_organization"], a["linkedin_url"]) == ("McDonald", "IBM India", "x")
+    assert b["firstname"] == "mcdonald"
+    # Interned: equal values are the same object, whatever whitespace they came with
+    assert a["current_organization"] is b["current_organization"]
+    assert table.normalize({"firstname": " McDonald "})["firstname"] == "McDonald"
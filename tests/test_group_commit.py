@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from backends import JsonBackend
+
+
+def put(seq, alumni_id, **fields):
+    record = {"id": alumni_id, "firstname": "Asha", "batch": alumni_id[4:], "gender": "Female", **fields}
+    return {"op": "put", "record": record, "seq": seq, "batch_counts": {}}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "alumni_data.json"), str(tmp_path / "alumni_journal.jsonl")
+
+
+def test_failed_append_leaves_nothing_behind(paths):
+    backend = JsonBackend(*paths)
+    backend.write([put(1, "001-2008-10")])
+    size = os.path.getsize(paths[1])
+
+    class Torn:
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            self.f.write(data[:10])
+            self.f.flush()
+            raise OSError("I/O error")
+
+        def __getattr__(self, name):
+            return getattr(self.f, name)
+
+    backend.journal._file = Torn(backend.journal._file)
+    with pytest.raises(OSError):
+        backend.write([put(2, "002-2008-10")])
+    assert os.path.getsize(paths[1]) == size
+    backend.write([put(3, "003-2008-10")])
+    backend.journal.close()
+    assert sorted(JsonBackend(*paths).load()["alumni"]) == ["001-2008-10", "003-2008-10"]
+
+
+def test_failed_write_changes_nothing(store):
+    alumni_id = next(iter(store.as_dict(("id",))["alumni"]))
+    before, seq = store.as_dict(), store.seq
+    store.backend.fail = True
+    with pytest.raises(OSError):
+        asyncio.run(store.put({**store.get(alumni_id), "firstname": "Zelda"}))
+    with pytest.raises(OSError):
+        asyncio.run(store.delete(alumni_id))
+    assert store.seq == seq and store.as_dict() == before
+    assert store.backend.load()["alumni"][alumni_id]["firstname"] != "Zelda"
+
+    store.backend.fail = False
+    asyncio.run(store.put({**store.get(alumni_id), "firstname": "Zelda"}))
+    assert store.get(alumni_id)["firstname"] == "Zelda"
+    assert store.backend.load()["alumni"][alumni_id]["firstname"] == "Zelda"
+
+
+def test_reads_go_on_while_a_group_is_written(store):
+    alumni_id = next(iter(store.as_dict(("id",))["alumni"]))
+    writing, write = threading.Event(), store.backend.write
+
+    def slow_write(ops):
+        writing.set()
+        time.sleep(0.5)
+        write(ops)
+    store.backend.write = slow_write
+
+    async def run():
+        task = asyncio.create_task(store.put({**store.get(alumni_id), "firstname": "Zelda"}))
+        await asyncio.to_thread(writing.wait)
+        start = time.perf_counter()
+        # Not applied before it is durable, and not blocked by the write either
+        assert store.get(alumni_id)["firstname"] != "Zelda"
+        assert time.perf_counter() - start < 0.1
+        await task
+        assert store.get(alumni_id)["firstname"] == "Zelda"
+    asyncio.run(run())
@@ -0,0 +1,144 @@
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+
+from indexes import RowIds, bitmap_rows, skill_key, split_skills
+from query import Filters, SortSpec
+
+QUERIES = [
+    (Filters(), "id"),
+    (Filters(batch="2010-12"), "id"),
+    (Filters(gender="Female"), "batch"),
+    (Filters(batch="2010-12", gender="Male"), "surname"),
+    (Filters(), "Industry_experiences"),
+    (Filters(batch="2010-12"), "Industry_experiences:desc"),
+    (Filters(min_experience=3, max_experience=9), "Industry_experiences"),
+    (Filters(batch_from=2008, batch_to=2014), "batch:desc,id"),
+    (Filters(skills=["Python"]), "current_organization"),
+]
+
+# What the indexes answer, for comparing a store that went through mutations
+# with one whose indexes were built from scratch over the same records
+OBSERVERS = {
+    "queries": lambda store: [[r["id"] for r in store.query(f, SortSpec.parse(s))[1]] for f, s in QUERIES],
+    "search": lambda store: [(w, store.search(w, 50)) for w in ["kotak", "manager", "mumbai", "renamed", "zelda"]],
+    "fuzzy": lambda store: [(w, store.fuzzy_names(w, 20)) for w in ["zelda", "satyjit"]],
+    "complete": lambda store: [
+        (k, p, store.complete(k, p, 50)) for k in ("name", "organization", "skill") for p in "skmz"
+    ],
+    "skills": lambda store: store.skill_query(["python"], ["sql", "r"], ["excel"]),
+    "facets": lambda store: store.facet_counts({}, [], ["batch", "gender", "organization", "location", "skill"], 500),
+    "stats": lambda store: store.stats(),
+}
+
+
+def mutate(store, records):
+    ids = sorted(records)
+    first, second, third = ids[0], ids[1], ids[2]
+    changed = {
+        **store.get(first),
+        "firstname": "Zelda", "gender": "Other", "batch": "2020-22", "Industry_experiences": 29.5,
+        "current_organization": "Renamed Ltd", "software_skill_1": "Python, Rust",
+    }
+    renamed = {**store.get(second), "id": "900-2021-23", "batch": "2021-23", "surname": "Renamed"}
+    created = {**store.get(ids[3]), "id": "901-2021-23", "batch": "2021-23", "current_location": "Zurich"}
+
+    async def run():
+        await store.put(changed)
+        await store.rename(second, renamed)
+        await store.delete(third)
+        await store.put(created)
+    asyncio.run(run())
+    return first, second, third
+
+
+def test_indexes_follow_updates_renames_and_deletes(store, records, make_store):
+    first, second, third = mutate(store, records)
+
+    assert second not in store and third not in store
+    assert "900-2021-23" in store and "901-2021-23" in store
+    by_id = [r["id"] for r in store.query(Filters(), SortSpec.parse("id"))[1]]
+    assert second not in by_id and third not in by_id and "900-2021-23" in by_id
+    assert [r["id"] for r in store.query(Filters(batch="2021-23"), SortSpec.parse("id"))[1]][-2:] == [
+        "900-2021-23", "901-2021-23",
+    ]
+    assert first in [r["id"] for r in store.query(Filters(batch="2020-22", gender="Other"), SortSpec.parse("id"))[1]]
+    assert [k[-1] for k in store.by_experience.range(False, None)] == [
+        r["id"] for r in store.query(Filters(), SortSpec.parse("Industry_experiences"))[1]
+    ]
+    assert sorted(r["id"] for r, _ in store.search("renamed")[1]) == sorted([first, "900-2021-23"])
+    assert store.fuzzy_names("zelda")[0][0]["id"] == first
+
+    # Same answers as indexes built from scratch over the resulting records
+    rebuilt = make_store(store.as_dict()["alumni"])
+    for name, observe in OBSERVERS.items():
+        assert observe(store) == observe(rebuilt), name
+
+
+def test_skill_suggestions_are_single_skills_counted_like_facets(store):
+    _, facets = store.facet_counts({}, [], ["skill"], 10_000)
+    counts = dict(facets["skill"])
+    suggestions = [s for p in "psem" for s in store.complete("skill", p, 10_000)]
+    assert suggestions
+    for skill, count in suggestions:
+        assert not set(",;/|") & set(skill), skill
+        assert counts[skill] == count, skill
+
+
+def test_bitmap_rows_match_the_set_bits():
+    rng = random.Random(7)
+    rows = RowIds()
+    rows.rebuild(f"id-{i}" for i in range(2000))
+    for alumni_id in rng.sample(range(2000), 300):
+        rows.release(f"id-{alumni_id}")
+    for density in (0, 0.001, 0.1, 0.9):
+        bitmap = sum(1 << i for i in range(2000) if rng.random() < density) & rows.alive
+        naive = [i for i in range(bitmap.bit_length()) if bitmap >> i & 1]
+        assert bitmap_rows(bitmap).tolist() == naive
+        assert rows.ids(bitmap) == [f"id-{i}" for i in naive]
+
+
+FACET_FIELDS = {
+    "batch": "batch", "gender": "gender", "organization": "current_organization", "location": "current_location",
+}
+
+
+@pytest.mark.parametrize("selected, skills", [
+    ({}, []),
+    ({"batch": "2010-12"}, []),
+    ({"gender": "Female"}, ["Excel"]),
+    ({"organization": "Ajanta Pharma Ltd"}, []),
+    ({"location": " Mumbai, Maharashtra, India "}, []),
+    ({"location": "Mumbai, Maharashtra, India", "gender": "Male"}, ["excel"]),
+    ({"organization": "Nowhere Inc"}, []),
+])
+@pytest.mark.parametrize("limit", [1, 3, 500])
+def test_facet_counts_match_a_full_scan(store, selected, skills, limit):
+    def value(record, facet):
+        v = record.get(FACET_FIELDS[facet])
+        return v.strip() if isinstance(v, str) else v
+
+    matching = [
+        r for r in store.as_dict()["alumni"].values()
+        if all(value(r, f) == v.strip() for f, v in selected.items())
+        and {skill_key(s) for s in skills} <= {skill_key(s) for s in split_skills(r)}
+    ]
+    total, counts = store.facet_counts(selected, skills, list(FACET_FIELDS), limit)
+    assert total == len(matching)
+    assert matching or selected.get("organization") == "Nowhere Inc"
+    for facet in FACET_FIELDS:
+        expected = Counter(value(r, facet) for r in matching if value(r, facet))
+        assert counts[facet] == sorted(expected.items(), key=lambda p: (-p[1], p[0]))[:limit], facet
+
+
+def test_stats_match_a_full_scan(store):
+    alumni = list(store.as_dict()["alumni"].values())
+    known = [r["Industry_experiences"] for r in alumni if r["Industry_experiences"] is not None]
+    stats = store.stats()
+    assert stats["overall"]["headcount"] == len(alumni)
+    assert stats["overall"]["with_experience"] == len(known)
+    assert stats["overall"]["mean"] == round(sum(known) / len(known), 2)
+    for batch, summary in stats["by_batch"].items():
+        assert summary["headcount"] == sum(r["batch"] == batch for r in alumni), batch
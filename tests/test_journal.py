@@ -0,0 +1,51 @@
+import pytest
+
+from backends import JsonBackend, write_snapshot
+from codec import codec
+
+
+def record(alumni_id, **fields):
+    return {"id": alumni_id, "firstname": "Asha", "batch": alumni_id[4:], "gender": "Female", **fields}
+
+
+def put(seq, alumni_id, **fields):
+    return {"op": "put", "record": record(alumni_id, **fields), "seq": seq, "batch_counts": {alumni_id[4:]: seq}}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "alumni_data.json"), str(tmp_path / "alumni_journal.jsonl")
+
+
+def test_journal_is_replayed_on_top_of_the_snapshot(paths):
+    write_snapshot(paths[0], {"alumni": {"001-2008-10": record("001-2008-10")}, "batch_counts": {"2008-10": 1}, "seq": 1})
+    backend = JsonBackend(*paths)
+    backend.write([
+        put(1, "001-2008-10", firstname="Stale"),  # already in the snapshot
+        put(2, "002-2008-10"),
+        {"op": "rename", "old_id": "001-2008-10", "record": record("001-2010-12"), "seq": 3, "batch_counts": {}},
+        {"op": "delete", "id": "002-2008-10", "seq": 4, "batch_counts": {}},
+    ])
+    backend.journal.close()
+
+    state = JsonBackend(*paths).load()
+    assert state["seq"] == 4
+    assert list(state["alumni"]) == ["001-2010-12"]
+    assert state["alumni"]["001-2010-12"]["firstname"] == "Asha"
+    assert state["batch_counts"] == {"2008-10": 2}
+
+
+def test_torn_last_line_is_dropped_and_cut_off(paths):
+    backend = JsonBackend(*paths)
+    backend.write([put(1, "001-2008-10"), put(2, "002-2008-10")])
+    backend.journal.close()
+    with open(paths[1], "ab") as f:
+        f.write(codec.dumps(put(3, "003-2008-10"))[:20])
+
+    backend = JsonBackend(*paths)
+    state = backend.load()
+    assert sorted(state["alumni"]) == ["001-2008-10", "002-2008-10"] and state["seq"] == 2
+    # New entries start on a fresh line instead of being glued onto the torn one
+    backend.write([put(3, "004-2008-10")])
+    backend.journal.close()
+    assert sorted(JsonBackend(*paths).load()["alumni"]) == ["001-2008-10", "002-2008-10", "004-2008-10"]
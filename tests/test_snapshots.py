@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from backends import JsonBackend, write_snapshot
+
+
+def record(alumni_id, **fields):
+    return {"id": alumni_id, "firstname": "Asha", "batch": alumni_id[4:], "gender": "Female", **fields}
+
+
+def put(seq, alumni_id, **fields):
+    return {"op": "put", "record": record(alumni_id, **fields), "seq": seq, "batch_counts": {alumni_id[4:]: seq}}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "alumni_data.json"), str(tmp_path / "alumni_journal.jsonl")
+
+
+def test_damaged_snapshot_falls_back_to_bak_and_prev_segment(paths):
+    backend = JsonBackend(*paths)
+    state = {"alumni": {}, "batch_counts": {}, "seq": 0}
+    for seq in range(1, 5):
+        op = put(seq, f"{seq:03d}-2008-10")
+        backend.write([op])
+        state["alumni"][op["record"]["id"]] = op["record"]
+        state["seq"] = seq
+        if seq % 2 == 0:
+            # Snapshots at seq 2 (becomes .bak) and 4; the journal holding 3-4 is retired to .prev
+            backend.checkpoint(state)
+    backend.write([put(5, "005-2008-10")])
+    backend.journal.close()
+    assert os.path.exists(paths[0] + ".bak") and os.path.exists(paths[1] + ".prev")
+
+    with open(paths[0], "wb") as f:
+        f.write(b'{"alumni": {"001-20')
+
+    state = JsonBackend(*paths).load()
+    assert state["seq"] == 5
+    assert sorted(state["alumni"]) == [f"{i:03d}-2008-10" for i in range(1, 6)]
+
+
+def test_refuses_to_start_empty_when_no_snapshot_is_readable(paths):
+    write_snapshot(paths[0], {"alumni": {}, "batch_counts": {}, "seq": 0})
+    write_snapshot(paths[0], {"alumni": {}, "batch_counts": {}, "seq": 0})
+    for path in (paths[0], paths[0] + ".bak"):
+        os.remove(path)
+        with open(path, "wb") as f:
+            f.write(b"{")
+    with pytest.raises(RuntimeError):
+        JsonBackend(*paths).load()
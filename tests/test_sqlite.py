@@ -0,0 +1,42 @@
+import pytest
+
+from backends import JsonBackend, SqliteBackend, StorageBackend, write_snapshot
+
+
+def record(alumni_id, **fields):
+    return {"id": alumni_id, "firstname": "Asha", "batch": alumni_id[4:], "gender": "Female", **fields}
+
+
+def put(seq, alumni_id, **fields):
+    return {"op": "put", "record": record(alumni_id, **fields), "seq": seq, "batch_counts": {alumni_id[4:]: seq}}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "alumni_data.json"), str(tmp_path / "alumni_journal.jsonl")
+
+
+def test_sqlite_backend_round_trip_and_migration(paths, tmp_path):
+    write_snapshot(paths[0], {"alumni": {"001-2008-10": record("001-2008-10")}, "batch_counts": {"2008-10": 1}, "seq": 1})
+    db_file = str(tmp_path / "alumni.db")
+    backend = SqliteBackend(db_file, migrate_from=JsonBackend(*paths))
+    assert list(backend.load()["alumni"]) == ["001-2008-10"]
+    backend.write([
+        put(2, "002-2008-10", Industry_experiences=4.5),
+        {"op": "rename", "old_id": "001-2008-10", "record": record("001-2010-12"), "seq": 3, "batch_counts": {}},
+    ])
+    backend.close({})
+
+    state = SqliteBackend(db_file).load()
+    assert state["seq"] == 3
+    assert sorted(state["alumni"]) == ["001-2010-12", "002-2008-10"]
+    assert state["alumni"]["002-2008-10"]["Industry_experiences"] == 4.5
+
+
+def test_backend_missing_a_method_fails_on_creation():
+    class ReadOnly(StorageBackend):
+        def load(self) -> dict:
+            return {}
+
+    with pytest.raises(TypeError):
+        ReadOnly()